@@ -1,10 +1,7 @@
 import streamlit as st
+import functools
 import os
 from dotenv import load_dotenv
-from services.maps_service import MapsService
-import folium
-from streamlit_folium import folium_static
-import json
 
 # Load environment variables
 load_dotenv()
@@ -20,45 +17,37 @@ st.set_page_config(
 # Validate and setup Google Cloud
 from config.google_cloud_setup import setup_google_cloud, validate_environment
 
+# Immutable UI constants, hoisted so reruns don't rebuild the literals
+_TRANSPORT_MODES = ("Flight", "Train", "Bus", "Car")
+_THEMES = ("Heritage", "Nightlife", "Adventure", "Nature", "Luxury", "Family", "Food")
+_LANGUAGES = ("English", "Hindi", "Telugu", "Tamil")
+_REQUIRED_ENV = ("GOOGLE_CLOUD_PROJECT", "GOOGLE_MAPS_API_KEY", "VERTEXAI_LOCATION")
+
+# AI service candidates, tried in order of preference
+_AI_CANDIDATES = [
+    ("services.ai_service_enhanced", "AIServiceEnhanced", "Enhanced AI Service with multiple itinerary options"),
+    ("services.ai_service_genai", "AIServiceGenAI", "Google GenAI SDK"),
+    ("services.ai_service_fallback", "AIServiceFallback", "legacy AI models (text-bison/chat-bison)"),
+]
+
 @st.cache_resource
 def get_ai_service():
     """Initialize AI service with caching to prevent re-initialization"""
-    # Try to initialize AI service with multiple fallbacks
-    ai_service = None
-    
-    # Try 1: Enhanced AI Service (with multiple options and natural language)
-    try:
-        from services.ai_service_enhanced import AIServiceEnhanced
-        ai_service = AIServiceEnhanced()
-        st.success("✅ Using Enhanced AI Service with multiple itinerary options")
-        return ai_service
-    except Exception as enhanced_error:
-        st.warning(f"⚠️ Enhanced AI not available: {str(enhanced_error)[:100]}...")
-        
-        # Try 2: GenAI SDK
+    import importlib
+
+    last_error = None
+    for module_name, class_name, label in _AI_CANDIDATES:
         try:
-            from services.ai_service_genai import AIServiceGenAI
-            ai_service = AIServiceGenAI()
-            st.success("✅ Using Google GenAI SDK")
+            service_class = getattr(importlib.import_module(module_name), class_name)
+            ai_service = service_class()
+            st.success(f"✅ Using {label}")
             return ai_service
-        except Exception as genai_error:
-            st.warning(f"⚠️ GenAI SDK not available: {str(genai_error)[:100]}...")
-            
-            # Try 3: Legacy models fallback
-            try:
-                from services.ai_service_fallback import AIServiceFallback
-                ai_service = AIServiceFallback()
-                st.success("✅ Using legacy AI models (text-bison/chat-bison)")
-                return ai_service
-            except Exception as fallback_error:
-                st.error(f"❌ No AI models available: {str(fallback_error)}")
-                st.stop()
-    
-    if not ai_service:
-        st.error("❌ Failed to initialize any AI service")
-        st.stop()
-    
-    return ai_service
+        except Exception as e:
+            last_error = e
+            st.warning(f"⚠️ {label} not available: {str(e)[:100]}...")
+
+    st.error(f"❌ No AI models available: {str(last_error)}")
+    st.stop()
 
 @st.cache_resource
 def get_export_service():
@@ -69,6 +58,7 @@ def get_export_service():
 @st.cache_resource
 def get_maps_service():
     """Initialize maps service with caching"""
+    from services.maps_service import MapsService
     cloud_services = setup_google_cloud()
     return MapsService(cloud_services['maps_client'])
 
@@ -76,50 +66,49 @@ def get_maps_service():
 maps_service = None
 ai_service = None
 
+@functools.lru_cache(maxsize=1)
+def _is_cloud_shell():
+    """Detect Cloud Shell once per process instead of stat()ing every rerun"""
+    return os.path.exists('/google/devshell/bashrc') or 'DEVSHELL_GCLOUD_CONFIG' in os.environ
+
 def validate_environment_for_cloud():
     """Validate environment variables for Cloud Run deployment"""
-    required_vars = [
-        'GOOGLE_CLOUD_PROJECT',
-        'GOOGLE_MAPS_API_KEY',
-        'VERTEXAI_LOCATION'
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
-    
+    # Read os.environ directly - it's a plain mapping, so this skips a
+    # function call per variable compared to os.getenv
+    env = os.environ
+    missing_vars = [var for var in _REQUIRED_ENV if not env.get(var)]
+
     if missing_vars:
         st.error(f"Missing required environment variables: {', '.join(missing_vars)}")
         st.error("Please check your environment configuration.")
         st.stop()
-    
+
     # Only check credentials file if running locally (not in Cloud Run)
-    if not os.getenv('K_SERVICE'):  # K_SERVICE is set in Cloud Run
-        creds_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+    if not env.get('K_SERVICE'):  # K_SERVICE is set in Cloud Run
+        creds_path = env.get('GOOGLE_APPLICATION_CREDENTIALS')
         if creds_path and not os.path.exists(creds_path):
             st.error(f"Credentials file not found at: {creds_path}")
             st.stop()
-try:
-    # Check if running in Cloud Shell
-    is_cloud_shell = os.path.exists('/google/devshell/bashrc') or 'DEVSHELL_GCLOUD_CONFIG' in os.environ
-    
-    if is_cloud_shell:
+@st.cache_resource
+def _bootstrap():
+    """Validate the environment and initialize all services once per worker"""
+    if _is_cloud_shell():
         st.info("🌟 Running in Google Cloud Shell - using default credentials")
     else:
         # Validate environment variables for local development
         validate_environment_for_cloud()
-        
+
         # Show credentials path for debugging
         creds_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
         if creds_path and not os.path.exists(creds_path):
             st.error(f"Credentials file not found at: {creds_path}")
             st.stop()
-    
+
     # Initialize services with caching (prevents re-initialization)
-    maps_service = get_maps_service()
-    ai_service = get_ai_service()
-    export_service = get_export_service()
+    return get_maps_service(), get_ai_service(), get_export_service()
+
+try:
+    maps_service, ai_service, export_service = _bootstrap()
 except Exception as e:
     st.error(f"Failed to initialize Google Cloud services: {str(e)}")
     st.info("Please make sure you have set up your Google Cloud credentials correctly.")
@@ -127,60 +116,189 @@ except Exception as e:
 
 
 
+@st.cache_data(ttl="24h", max_entries=500)
+def _geocode(destination):
+    """Geocode a destination with caching so reruns don't re-hit the Maps API"""
+    return maps_service.gmaps.geocode(destination)
+
+
+@st.cache_data(ttl="1h", max_entries=200)
+def _cached_itinerary_options(destination, duration, budget, themes_tuple):
+    """Generate itinerary options once per unique request within the TTL"""
+    return ai_service.generate_multiple_itineraries(destination, duration, budget, list(themes_tuple))
+
+
+def _itin_key(itinerary):
+    """Stable content key for an itinerary, used by the cached renderers.
+
+    pickle + blake2b stays in C the whole way, unlike json.dumps with
+    sort_keys which sorts and string-encodes every nested key first.
+    """
+    import hashlib
+    import pickle
+    return hashlib.blake2b(pickle.dumps(itinerary, protocol=5), digest_size=16).hexdigest()
+
+
+def _format_activity_html(activity):
+    """Format one activity as a collapsible <details> block.
+
+    Plain HTML keeps each activity to a single markdown delta instead
+    of the expander + columns widget tree Streamlit would otherwise
+    ship per activity.
+    """
+    act_get = activity.get
+    if act_get('hotel_recommendation'):
+        summary = f"🏨 {act_get('time', 'Night')}: {act_get('activity', 'Accommodation')}"
+        lines = [
+            f"<b>Location:</b> {act_get('place', 'N/A')} &nbsp;|&nbsp; <b>Duration:</b> {act_get('duration', '8-10 hours')}",
+            f"<b>Cost:</b> ₹{act_get('cost', 0)}/night &nbsp;|&nbsp; <b>Type:</b> Accommodation",
+        ]
+    elif act_get('flight_recommendation'):
+        summary = f"✈️ {act_get('time', 'Morning')}: {act_get('activity', 'Flight')}"
+        lines = [
+            f"<b>Destination:</b> {act_get('place', 'N/A')} &nbsp;|&nbsp; <b>Duration:</b> {act_get('duration', '2-3 hours')}",
+            f"<b>Cost:</b> ₹{act_get('cost', 0)} &nbsp;|&nbsp; <b>Type:</b> Flight",
+        ]
+    elif act_get('transport_recommendation'):
+        summary = f"🚗 {act_get('time', 'Morning')}: {act_get('activity', 'Transport')}"
+        lines = [
+            f"<b>Location:</b> {act_get('place', 'N/A')} &nbsp;|&nbsp; <b>Duration:</b> {act_get('duration', '1 hour')}",
+            f"<b>Cost:</b> ₹{act_get('cost', 0)}/day &nbsp;|&nbsp; <b>Type:</b> Transportation",
+        ]
+    else:
+        summary = f"{act_get('time', 'TBD')}: {act_get('activity', 'Activity')}"
+        line = f"<b>Duration:</b> {act_get('duration', 'TBD')} &nbsp;|&nbsp; <b>Cost:</b> ₹{act_get('cost', 0)}"
+        if act_get('place'):
+            line += f" &nbsp;|&nbsp; <b>Location:</b> {activity['place']}"
+        lines = [line]
+        if act_get('influencer_recommended'):
+            lines.append("✨ <i>Recommended by local influencer!</i>")
+            if act_get('tip'):
+                lines.append(f"💡 <b>Tip:</b> {activity['tip']}")
+        if act_get('youtube_recommended'):
+            lines.append(f"📺 <i>Featured in: {act_get('video_title', 'Travel Video')}</i>")
+            if act_get('video_id'):
+                lines.append(f"<a href='https://youtube.com/watch?v={activity['video_id']}'>Watch Video</a>")
+
+    if act_get('details'):
+        lines.append(f"<b>Details:</b> {activity['details']}")
+
+    body = "<br>".join(lines)
+    return f"<details><summary>{summary}</summary><div>{body}</div></details>"
+
+
+@st.cache_data(max_entries=200)
+def _render_day_markdown(itin_hash, day_idx, day_plan_json):
+    """Build one day's activity HTML once per itinerary version.
+
+    Keyed on the itinerary content hash so tab switches and unrelated
+    reruns reuse the rendered string instead of re-walking every
+    activity dict.
+    """
+    import json
+    day_plan = json.loads(day_plan_json)
+    return "\n".join(_format_activity_html(activity) for activity in day_plan['activities'])
+
+
+# Export results keyed on the itinerary content hash; the _itinerary
+# argument's leading underscore excludes the large dict from hashing
+@st.cache_data(max_entries=50, ttl="1h")
+def _cached_pdf(itin_hash, _itinerary):
+    """Generate (or reuse) the PDF export for this itinerary version"""
+    return export_service.export_to_pdf(_itinerary)
+
+
+@st.cache_data(max_entries=50, ttl="1h")
+def _cached_json(itin_hash, _itinerary):
+    """Generate (or reuse) the JSON export for this itinerary version"""
+    return export_service.export_to_json(_itinerary)
+
+
+@st.cache_data(max_entries=50, ttl="1h")
+def _cached_share_link(itin_hash, _itinerary):
+    """Create (or reuse) the share link for this itinerary version"""
+    return export_service.create_shareable_link(_itinerary)
+
+
+@st.cache_data(max_entries=200)
+def _render_map_html(lat, lng, label):
+    """Build the folium map and return its rendered HTML, cached per location"""
+    import folium
+    m = folium.Map(location=[lat, lng], zoom_start=13)
+    folium.Marker(
+        [lat, lng],
+        popup=label,
+        icon=folium.Icon(color='red', icon='info-sign')
+    ).add_to(m)
+    return m._repr_html_()
+
+
 def main():
     st.title("🧠 TravelMind AI - Your Intelligent Travel Companion")
-    
+
+    # Bind the session-state proxy once; every rerun re-enters main so
+    # repeated attribute dispatch through the proxy adds up
+    ss = st.session_state
+    ss.setdefault('itinerary_options', [])
+
+
     # Sidebar for user inputs
     with st.sidebar:
         st.header("Trip Details")
-        
-        # Basic inputs
-        origin = st.text_input("From", "Delhi")
-        destination = st.text_input("To", "Goa")
-        start_date = st.date_input("Start Date")
-        duration = st.number_input("Number of Days", min_value=1, max_value=30, value=3)
-        
-        # Transport mode
-        transport_mode = st.selectbox(
-            "Preferred Mode of Transport",
-            ["Flight", "Train", "Bus", "Car"]
-        )
-        
-        # Budget slider
-        budget = st.slider("Budget (₹)", 10000, 100000, 25000, step=5000)
-        
-        # Theme selection
-        themes = st.multiselect(
-            "Travel Themes",
-            ["Heritage", "Nightlife", "Adventure", "Nature", "Luxury", "Family", "Food"]
-        )
-        
-        # Language selection
-        language = st.selectbox("Language", ["English", "Hindi", "Telugu", "Tamil"])
-        
-        # Generate button
-        if st.button("Generate Itinerary", type="primary"):
+
+        # Batch all trip inputs in a form so filling them in doesn't
+        # trigger a full-script rerun per widget change - state is only
+        # submitted when "Generate Itinerary" is clicked
+        with st.form("trip_form"):
+            # Basic inputs
+            origin = st.text_input("From", "Delhi")
+            destination = st.text_input("To", "Goa")
+            start_date = st.date_input("Start Date")
+            duration = st.number_input("Number of Days", min_value=1, max_value=30, value=3)
+
+            # Transport mode
+            transport_mode = st.selectbox(
+                "Preferred Mode of Transport",
+                _TRANSPORT_MODES
+            )
+
+            # Budget slider
+            budget = st.slider("Budget (₹)", 10000, 100000, 25000, step=5000)
+
+            # Theme selection
+            themes = st.multiselect(
+                "Travel Themes",
+                _THEMES
+            )
+
+            # Language selection
+            language = st.selectbox("Language", _LANGUAGES)
+
+            # Generate button
+            generate_clicked = st.form_submit_button("Generate Itinerary", type="primary")
+
+        if generate_clicked:
             with st.spinner("🤖 Generating multiple itinerary options..."):
                 try:
                     # Check if we have enhanced AI service
                     if hasattr(ai_service, 'generate_multiple_itineraries'):
                         # Generate multiple options
-                        options = ai_service.generate_multiple_itineraries(destination, duration, budget, themes)
+                        options = _cached_itinerary_options(destination, duration, budget, tuple(themes))
                         if options:
-                            st.session_state.itinerary_options = options
-                            st.session_state.selected_itinerary = ai_service._select_best_option(options, budget)
+                            ss.itinerary_options = options
+                            ss.selected_itinerary = ai_service._select_best_option(options, budget)
                         else:
                             # Fallback to single itinerary
                             itinerary = generate_itinerary(destination, duration, budget, themes)
-                            st.session_state.selected_itinerary = itinerary
-                            st.session_state.itinerary_options = [itinerary]
+                            ss.selected_itinerary = itinerary
+                            ss.itinerary_options = [itinerary]
                     else:
                         # Single itinerary generation
                         itinerary = generate_itinerary(destination, duration, budget, themes)
-                        st.session_state.selected_itinerary = itinerary
-                        st.session_state.itinerary_options = [itinerary]
-                    
-                    st.session_state.generate_plan = True
+                        ss.selected_itinerary = itinerary
+                        ss.itinerary_options = [itinerary]
+
+                    ss.generate_plan = True
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error generating itinerary: {str(e)}")
@@ -193,22 +311,23 @@ def main():
         if st.button("Load Shared Itinerary") and share_code:
             shared_itinerary = export_service.load_shared_itinerary(share_code.upper())
             if shared_itinerary:
-                st.session_state.selected_itinerary = shared_itinerary
-                st.session_state.generate_plan = True
+                ss.selected_itinerary = shared_itinerary
+                ss.generate_plan = True
                 st.success("✅ Shared itinerary loaded successfully!")
                 st.rerun()
             else:
                 st.error("❌ Invalid share code or itinerary not found")
 
     # Main content area
-    if 'generate_plan' in st.session_state and st.session_state.selected_itinerary is not None:
+    if ss.get('generate_plan') and ss.get('selected_itinerary') is not None:
         # Show itinerary options if available
-        if 'itinerary_options' in st.session_state and len(st.session_state.itinerary_options) > 1:
+        options = ss.itinerary_options
+        if len(options) > 1:
             st.subheader("🎯 Choose Your Preferred Itinerary")
-            
-            option_cols = st.columns(len(st.session_state.itinerary_options))
-            
-            for idx, option in enumerate(st.session_state.itinerary_options):
+
+            option_cols = st.columns(len(options))
+
+            for idx, option in enumerate(options):
                 with option_cols[idx]:
                     st.markdown(f"""
                     **{option.get('budget_type', 'Option')} Plan**  
@@ -217,12 +336,12 @@ def main():
                     """)
                     
                     if st.button(f"Select {option.get('budget_type', 'This')} Plan", key=f"select_{idx}"):
-                        st.session_state.selected_itinerary = option
+                        ss.selected_itinerary = option
                         st.success(f"✅ Selected {option.get('budget_type', 'This')} Plan!")
                         st.rerun()
         
         # Display selected itinerary
-        display_itinerary(st.session_state.selected_itinerary)
+        display_itinerary(ss.selected_itinerary)
         
         # Natural language modification
         st.markdown("---")
@@ -241,10 +360,10 @@ def main():
                     with st.spinner("🤖 Applying your modifications..."):
                         try:
                             modified_itinerary = ai_service.modify_itinerary(
-                                st.session_state.selected_itinerary, 
+                                ss.selected_itinerary,
                                 modification_request
                             )
-                            st.session_state.selected_itinerary = modified_itinerary
+                            ss.selected_itinerary = modified_itinerary
                             st.success("✅ Itinerary modified successfully!")
                             st.rerun()
                         except Exception as e:
@@ -254,7 +373,7 @@ def main():
         
         with col2:
             if st.button("🔄 Generate New Options"):
-                st.session_state.generate_plan = False
+                ss.generate_plan = False
                 st.rerun()
 
 def generate_itinerary(destination, duration, budget, themes):
@@ -273,49 +392,55 @@ def generate_itinerary(destination, duration, budget, themes):
         
     except Exception as e:
         st.error(f"Error generating itinerary: {str(e)}")
-        
-        # Return a basic fallback itinerary
-        daily_budget = budget // duration
-        fallback_itinerary = {
-            'destination': destination,
-            'duration': duration,
-            'budget': budget,
-            'daily_plans': []
-        }
-        
-        for day in range(1, duration + 1):
-            fallback_itinerary['daily_plans'].append({
+        return _fallback_itinerary(destination, duration, budget)
+
+
+@st.cache_data(max_entries=50)
+def _fallback_itinerary(destination, duration, budget):
+    """Build a basic template itinerary when the AI service fails.
+
+    The three activity slots are formatted once and copied per day
+    instead of re-building the dict literals in a loop; identical
+    fallback requests come straight from the cache.
+    """
+    per_slot = (budget // duration) // 3
+    morning = {
+        'time': '9:00 AM',
+        'activity': f'Explore popular attractions in {destination}',
+        'cost': per_slot,
+        'duration': '3 hours'
+    }
+    afternoon = {
+        'time': '2:00 PM',
+        'activity': f'Visit local markets and restaurants in {destination}',
+        'cost': per_slot,
+        'duration': '4 hours'
+    }
+    evening = {
+        'time': '7:00 PM',
+        'activity': f'Evening entertainment in {destination}',
+        'cost': per_slot,
+        'duration': '3 hours'
+    }
+
+    return {
+        'destination': destination,
+        'duration': duration,
+        'budget': budget,
+        'daily_plans': [
+            {
                 'day': day,
-                'activities': [
-                    {
-                        'time': '9:00 AM',
-                        'activity': f'Explore popular attractions in {destination}',
-                        'cost': daily_budget // 3,
-                        'duration': '3 hours'
-                    },
-                    {
-                        'time': '2:00 PM',
-                        'activity': f'Visit local markets and restaurants in {destination}',
-                        'cost': daily_budget // 3,
-                        'duration': '4 hours'
-                    },
-                    {
-                        'time': '7:00 PM',
-                        'activity': f'Evening entertainment in {destination}',
-                        'cost': daily_budget // 3,
-                        'duration': '3 hours'
-                    }
-                ]
-            })
-        
-        fallback_itinerary['data_sources'] = {
+                'activities': [morning.copy(), afternoon.copy(), evening.copy()]
+            }
+            for day in range(1, duration + 1)
+        ],
+        'data_sources': {
             'influencer_recommendations': 0,
             'youtube_content': 0,
             'template_based': True,
             'ai_powered': False
         }
-        
-        return fallback_itinerary
+    }
 
 def display_itinerary(itinerary):
     if not isinstance(itinerary, dict):
@@ -355,93 +480,46 @@ def display_itinerary(itinerary):
     except Exception as e:
         st.error(f"Error creating day tabs: {str(e)}")
         return
-    
-    # Display daily activities in tabs
+
+    # Display daily activities in tabs, rendering each day once per
+    # itinerary version via the cached markdown builder
+    import json
+    itin_hash = _itin_key(itinerary)
     for idx, tab in enumerate(tabs):
         with tab:
             daily_plan = itinerary['daily_plans'][idx]
-            
-            # Display activities
-            for activity in daily_plan['activities']:
-                # Special styling for different activity types
-                if activity.get('hotel_recommendation'):
-                    with st.expander(f"🏨 {activity.get('time', 'Night')}: {activity.get('activity', 'Accommodation')}", expanded=False):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"**Location:** {activity.get('place', 'N/A')}")
-                            st.write(f"**Duration:** {activity.get('duration', '8-10 hours')}")
-                        with col2:
-                            st.write(f"**Cost:** ₹{activity.get('cost', 0)}/night")
-                            st.write(f"**Type:** Accommodation")
-                        if activity.get('details'):
-                            st.write(f"**Details:** {activity['details']}")
-                elif activity.get('flight_recommendation'):
-                    with st.expander(f"✈️ {activity.get('time', 'Morning')}: {activity.get('activity', 'Flight')}", expanded=False):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"**Destination:** {activity.get('place', 'N/A')}")
-                            st.write(f"**Duration:** {activity.get('duration', '2-3 hours')}")
-                        with col2:
-                            st.write(f"**Cost:** ₹{activity.get('cost', 0)}")
-                            st.write(f"**Type:** Flight")
-                        if activity.get('details'):
-                            st.write(f"**Details:** {activity['details']}")
-                elif activity.get('transport_recommendation'):
-                    with st.expander(f"🚗 {activity.get('time', 'Morning')}: {activity.get('activity', 'Transport')}", expanded=False):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"**Location:** {activity.get('place', 'N/A')}")
-                            st.write(f"**Duration:** {activity.get('duration', '1 hour')}")
-                        with col2:
-                            st.write(f"**Cost:** ₹{activity.get('cost', 0)}/day")
-                            st.write(f"**Type:** Transportation")
-                        if activity.get('details'):
-                            st.write(f"**Details:** {activity['details']}")
-                else:
-                    with st.expander(f"{activity.get('time', 'TBD')}: {activity.get('activity', 'Activity')}"):
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.write(f"**Duration:** {activity.get('duration', 'TBD')}")
-                            st.write(f"**Cost:** ₹{activity.get('cost', 0)}")
-                        with col2:
-                            if activity.get('place'):
-                                st.write(f"**Location:** {activity['place']}")
-                        
-                        # Show detailed description
-                        if activity.get('details'):
-                            st.write(f"**Details:** {activity['details']}")
-                        
-                        # Show recommendations
-                        if activity.get('influencer_recommended'):
-                            st.info("✨ Recommended by local influencer!")
-                            if activity.get('tip'):
-                                st.write(f"💡 **Tip:** {activity['tip']}")
-                        if activity.get('youtube_recommended'):
-                            video_title = activity.get('video_title', 'Travel Video')
-                            st.info(f"📺 Featured in: {video_title}")
-                            if activity.get('video_id'):
-                                st.markdown(f"[Watch Video](https://youtube.com/watch?v={activity['video_id']})")
-
-    # Add a map
+            day_md = _render_day_markdown(
+                itin_hash, idx,
+                json.dumps(daily_plan, sort_keys=True, default=str)
+            )
+            st.markdown(day_md, unsafe_allow_html=True)
+
+    # Map and export sections run as fragments so widget interactions
+    # elsewhere (e.g. typing a modification request) don't re-render them
+    _render_map_fragment(itinerary)
+    _render_export_fragment(itinerary)
+
+
+@st.fragment
+def _render_map_fragment(itinerary):
+    """Render the destination map; reruns are scoped to this fragment"""
     st.subheader("📍 Destinations on Map")
+    # Deferred until requested so the geocode round-trip and folium
+    # render stay off the first paint after generation; the toggle only
+    # reruns this fragment
+    if not st.toggle("🗺️ Show map", key="show_map"):
+        return
     if maps_service:
         try:
             # Get location coordinates using Maps service
-            location_result = maps_service.gmaps.geocode(itinerary['destination'])
+            location_result = _geocode(itinerary['destination'])
             if location_result:
                 lat = location_result[0]['geometry']['location']['lat']
                 lng = location_result[0]['geometry']['location']['lng']
-                
-                # Create map centered on destination
-                m = folium.Map(location=[lat, lng], zoom_start=13)
-                folium.Marker(
-                    [lat, lng],
-                    popup=itinerary['destination'],
-                    icon=folium.Icon(color='red', icon='info-sign')
-                ).add_to(m)
-                
-                # Display map using st_folium
-                st.components.v1.html(m._repr_html_(), height=400)
+
+                # Display the cached map render centered on the destination
+                map_html = _render_map_html(lat, lng, itinerary['destination'])
+                st.components.v1.html(map_html, height=400)
             else:
                 st.warning(f"Could not find coordinates for {itinerary['destination']}")
         except Exception as e:
@@ -449,16 +527,26 @@ def display_itinerary(itinerary):
     else:
         st.warning("Map service is not initialized. Please check your Google Maps API configuration.")
 
-    # Export and Share buttons
+
+@st.fragment
+def _render_export_fragment(itinerary):
+    """Render the Export & Share buttons; reruns are scoped to this fragment"""
     st.markdown("---")
     st.subheader("📤 Export & Share")
-    
+    # Deferred like the map section - the column layout and buttons are
+    # only built once the user opens the section
+    if not st.toggle("Show export options", key="show_export"):
+        return
+
+    # Hash once so repeated export clicks hit the cached results
+    itin_hash = _itin_key(itinerary)
+
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
         if st.button("📄 Export PDF", type="secondary"):
             with st.spinner("Generating PDF..."):
-                pdf_path = export_service.export_to_pdf(itinerary)
+                pdf_path = _cached_pdf(itin_hash, itinerary)
                 if pdf_path:
                     download_link = export_service.get_download_link(pdf_path)
                     if download_link:
@@ -472,7 +560,7 @@ def display_itinerary(itinerary):
     with col2:
         if st.button("📋 Export JSON", type="secondary"):
             with st.spinner("Generating JSON..."):
-                json_path = export_service.export_to_json(itinerary)
+                json_path = _cached_json(itin_hash, itinerary)
                 if json_path:
                     download_link = export_service.get_download_link(json_path)
                     if download_link:
@@ -486,7 +574,7 @@ def display_itinerary(itinerary):
     with col3:
         if st.button("🔗 Create Share Link", type="secondary"):
             with st.spinner("Creating shareable link..."):
-                share_info = export_service.create_shareable_link(itinerary)
+                share_info = _cached_share_link(itin_hash, itinerary)
                 if share_info:
                     st.success("✅ Share link created!")
                     st.code(f"Share Code: {share_info['share_code']}")
@@ -5,8 +5,26 @@ Check what AI models are actually available in your Google Cloud project
 
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+def _list_models(location, project_id):
+    """Run 'gcloud ai models list' for one location"""
+    return subprocess.run(
+        ['gcloud', 'ai', 'models', 'list', f'--region={location}', f'--project={project_id}'],
+        capture_output=True, text=True, timeout=30
+    )
+
+def _probe_legacy_model(model_name):
+    """Try one legacy text model; returns (model_name, response_or_None, error_or_None)"""
+    from vertexai.language_models import TextGenerationModel
+    try:
+        model = TextGenerationModel.from_pretrained(model_name)
+        response = model.predict("Hello", max_output_tokens=5)
+        return model_name, response, None
+    except Exception as e:
+        return model_name, None, str(e)
+
 def check_available_models():
     """Check what models are available via gcloud"""
     load_dotenv()
@@ -17,58 +35,59 @@ def check_available_models():
     print(f"📋 Project: {project_id}")
     print("=" * 60)
     
-    # Check Vertex AI models
+    # Check Vertex AI models - the per-location gcloud calls are
+    # independent (up to 30s each), so fire them concurrently
     print("\n🤖 Checking Vertex AI models...")
     locations = ['us-central1', 'us-east1', 'us-west1']
-    
-    for location in locations:
-        print(f"\n📍 Location: {location}")
-        try:
-            # Try to list models in this location
-            cmd = f"gcloud ai models list --region={location} --project={project_id}"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                if result.stdout.strip():
-                    print(f"  ✅ Models available:")
-                    print(f"  {result.stdout}")
+
+    with ThreadPoolExecutor(max_workers=len(locations)) as executor:
+        futures = {loc: executor.submit(_list_models, loc, project_id) for loc in locations}
+
+        for location in locations:
+            print(f"\n📍 Location: {location}")
+            try:
+                result = futures[location].result()
+
+                if result.returncode == 0:
+                    if result.stdout.strip():
+                        print(f"  ✅ Models available:")
+                        print(f"  {result.stdout}")
+                    else:
+                        print(f"  ⚠️  No models listed (but API accessible)")
                 else:
-                    print(f"  ⚠️  No models listed (but API accessible)")
-            else:
-                print(f"  ❌ Error: {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            print(f"  ⏰ Timeout checking {location}")
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)}")
-    
-    # Check if we can access any text generation models
+                    print(f"  ❌ Error: {result.stderr}")
+
+            except subprocess.TimeoutExpired:
+                print(f"  ⏰ Timeout checking {location}")
+            except Exception as e:
+                print(f"  ❌ Error: {str(e)}")
+
+    # Check if we can access any text generation models - probe the
+    # three model names in parallel too, then report in preference order
     print(f"\n📝 Checking legacy text models...")
     try:
         import vertexai
-        from vertexai.language_models import TextGenerationModel
-        
+
         vertexai.init(project=project_id, location='us-central1')
-        
+
         legacy_models = ['text-bison', 'text-bison@001', 'text-bison@002']
-        
-        for model_name in legacy_models:
-            try:
-                print(f"  🧪 Testing {model_name}...", end=" ")
-                model = TextGenerationModel.from_pretrained(model_name)
-                response = model.predict("Hello", max_output_tokens=5)
-                if response and response.text:
-                    print("✅ WORKING")
-                    return model_name  # Return first working model
-                else:
-                    print("⚠️  NO RESPONSE")
-            except Exception as e:
-                error_msg = str(e)
-                if "not found" in error_msg.lower():
+
+        with ThreadPoolExecutor(max_workers=len(legacy_models)) as executor:
+            probes = list(executor.map(_probe_legacy_model, legacy_models))
+
+        for model_name, response, error in probes:
+            print(f"  🧪 Testing {model_name}...", end=" ")
+            if error:
+                if "not found" in error.lower():
                     print("❌ NOT FOUND")
                 else:
-                    print(f"❌ ERROR: {error_msg[:30]}...")
-                    
+                    print(f"❌ ERROR: {error[:30]}...")
+            elif response and response.text:
+                print("✅ WORKING")
+                return model_name  # Return first working model
+            else:
+                print("⚠️  NO RESPONSE")
+
     except ImportError:
         print("  ❌ Vertex AI SDK not available")
     except Exception as e:
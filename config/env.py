@@ -0,0 +1,36 @@
+import os
+import types
+
+# Every env var the app reads. Lookups via os.getenv go through the
+# environ mapping (plus encoding on POSIX) on each call, so the values
+# are snapshotted once at import and exposed read-only.
+REQUIRED_VARS = (
+    'GOOGLE_CLOUD_PROJECT',
+    'GOOGLE_MAPS_API_KEY',
+    'GOOGLE_APPLICATION_CREDENTIALS',
+)
+OPTIONAL_VARS = (
+    'YOUTUBE_API_KEY',
+    'VERTEXAI_LOCATION',
+    'K_SERVICE',
+    'DEVSHELL_GCLOUD_CONFIG',
+)
+
+
+def _snapshot():
+    return types.MappingProxyType({k: os.getenv(k) for k in REQUIRED_VARS + OPTIONAL_VARS})
+
+
+def _detect_cloud_shell(env):
+    return os.path.exists('/google/devshell/bashrc') or env['DEVSHELL_GCLOUD_CONFIG'] is not None
+
+
+ENV = _snapshot()
+IS_CLOUD_SHELL = _detect_cloud_shell(ENV)
+
+
+def clear_cache():
+    """Re-read the environment (for tests and post-load_dotenv refreshes)"""
+    global ENV, IS_CLOUD_SHELL
+    ENV = _snapshot()
+    IS_CLOUD_SHELL = _detect_cloud_shell(ENV)
@@ -4,12 +4,22 @@ from google.oauth2 import service_account
 from google.auth import default
 import googlemaps
 
+from config.env import ENV, IS_CLOUD_SHELL
+
+# Setup result reused for the lifetime of the process
+_cloud_services = None
+
 def setup_google_cloud():
     """Setup Google Cloud credentials and initialize services"""
+    global _cloud_services
+    if _cloud_services is not None:
+        return _cloud_services
+
     try:
         # Check if running in Cloud Shell (has default credentials)
-        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        credentials_path = ENV['GOOGLE_APPLICATION_CREDENTIALS']
         
+        project_from_creds = None
         if credentials_path and os.path.exists(credentials_path):
             # Local development with service account
             print("🔑 Using service account credentials")
@@ -20,21 +30,21 @@ def setup_google_cloud():
             # Cloud Shell or other environment with default credentials
             print("🌟 Using default Google Cloud credentials (Cloud Shell)")
             credentials, project_from_creds = default()
-            
-        # Set up Google Cloud project
-        project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
+
+        # Set up Google Cloud project - ADC already resolved it, so no
+        # need to fork a gcloud subprocess to ask again
+        project_id = ENV['GOOGLE_CLOUD_PROJECT'] or project_from_creds
         if not project_id:
-            # Try to get from default credentials in Cloud Shell
+            # Last resort on GCE/Cloud Run: the metadata server answers
+            # in milliseconds
             try:
-                import subprocess
-                result = subprocess.run(['gcloud', 'config', 'get-value', 'project'], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    project_id = result.stdout.strip()
-                    print(f"📋 Detected project ID: {project_id}")
-            except:
+                from google.auth.compute_engine import _metadata
+                from google.auth.transport.requests import Request
+                project_id = _metadata.get_project_id(Request())
+                print(f"📋 Detected project ID from metadata server: {project_id}")
+            except Exception:
                 pass
-                
+
         if not project_id:
             raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set and could not detect project")
 
@@ -45,26 +55,27 @@ def setup_google_cloud():
         )
 
         # Initialize Maps client
-        maps_api_key = os.getenv('GOOGLE_MAPS_API_KEY')
+        maps_api_key = ENV['GOOGLE_MAPS_API_KEY']
         if not maps_api_key:
             raise ValueError("GOOGLE_MAPS_API_KEY environment variable not set")
         
         maps_client = googlemaps.Client(key=maps_api_key)
 
-        return {
+        _cloud_services = {
             'credentials': credentials,
             'project_id': project_id,
             'maps_client': maps_client
         }
+        return _cloud_services
 
     except Exception as e:
         raise Exception(f"Failed to setup Google Cloud: {str(e)}")
 
 def validate_environment():
     """Validate all required environment variables are set"""
-    # Check if running in Cloud Shell
-    is_cloud_shell = os.path.exists('/google/devshell/bashrc') or 'DEVSHELL_GCLOUD_CONFIG' in os.environ
-    
+    # Cloud Shell detection happens once at import in config.env
+    is_cloud_shell = IS_CLOUD_SHELL
+
     if is_cloud_shell:
         # In Cloud Shell, only API keys are required
         required_vars = ['GOOGLE_MAPS_API_KEY']
@@ -78,11 +89,8 @@ def validate_environment():
         ]
         optional_vars = ['YOUTUBE_API_KEY']
     
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
-    
+    missing_vars = [var for var in required_vars if not ENV.get(var)]
+
     if missing_vars:
         if is_cloud_shell:
             raise ValueError(
@@ -1,62 +1,466 @@
 from google import genai
 from google.genai.types import GenerateContentConfig
 from google.cloud import bigquery
+import asyncio
+import copy
+import functools
+import hashlib
 import json
 import os
-import random
 import re
-from datetime import datetime, timedelta
+import textwrap
+import threading
+import time
 from services.youtube_service import YouTubeService
 
+# Cap on concurrent Vertex AI calls, shared across all service instances.
+# Replaces the old fixed time.sleep(1) serialization in _generate_with_gemini.
+_GEMINI_CONCURRENCY = threading.Semaphore(3)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Paces Vertex calls to the project quota without penalizing idle periods
+_VERTEX_LIMITER = _TokenBucket(float(os.getenv('VERTEX_QPS', '10')))
+
+# Clients are process-wide singletons: each carries its own auth handshake
+# and connection pool, so per-instance construction wastes both.
+_GENAI_CLIENT = None
+_BQ_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_genai_client(project, location):
+    global _GENAI_CLIENT
+    if _GENAI_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _GENAI_CLIENT is None:
+                _GENAI_CLIENT = genai.Client(project=project, location=location)
+    return _GENAI_CLIENT
+
+
+def _get_bq_client():
+    global _BQ_CLIENT
+    if _BQ_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _BQ_CLIENT is None:
+                try:
+                    _BQ_CLIENT = bigquery.Client()
+                except Exception as e:
+                    print(f"BigQuery client initialization failed: {str(e)}")
+                    return None
+    return _BQ_CLIENT
+
+# Parser patterns compiled once at import. The extraction helpers run these
+# per line over every Gemini response (three options per generation), so
+# matching should stay in C instead of re-resolving patterns each call.
+# Splitting on the header is linear in the response length; the old
+# capture-with-lookahead pattern re-scanned ahead to the next "Day N" for
+# every block, going quadratic on long multi-day responses.
+_DAY_SPLIT = re.compile(r'Day\s*(\d+)[:.]?\s*', re.IGNORECASE)
+_DAY_BOUNDARY = re.compile(r'Day\s*(\d+)[:.]', re.IGNORECASE)
+# Single alternation per concern: one engine pass per line instead of one
+# search per variant. m.group(m.lastgroup) recovers whichever branch hit.
+_TIME_UNION = re.compile(
+    r'\b(?P<clock>\d{1,2}:\d{2}\s*(?:AM|PM)\b)'
+    r'|\b(?P<range>\d{1,2}-\d{1,2}\s*(?:AM|PM)\b)'
+    r'|\b(?P<hour>\d{1,2}\s*(?:AM|PM)\b)'
+    # Phase words anchor only at the start of a line (after bullet/header
+    # markup); a mid-sentence "morning walk" is prose, not a new activity
+    r'|^[ \t#*-]*(?P<phase>(?:Morning|Afternoon|Evening|Night)\b)',
+    re.IGNORECASE | re.MULTILINE,
+)
+# Fused cost + duration + place alternation: the activity parser runs this
+# once per line and dispatches on the named group, instead of walking the
+# three pattern tables below in separate passes. The standalone helpers
+# keep their own tables for callers that want a single field.
+_LINE_FIELDS = re.compile(
+    r'₹(?P<cost_rupee>\d+(?:,\d+)*)'
+    r'|INR\s*(?P<cost_inr>\d+(?:,\d+)*)'
+    r'|Rs\.?\s*(?P<cost_rs>\d+(?:,\d+)*)'
+    r'|(?P<cost_words>\d+(?:,\d+)*)\s*rupees'
+    r'|(?P<dur_hours>\d+)\s*(?:hours?|hrs?)'
+    r'|(?P<dur_minutes>\d+)\s*(?:minutes?|mins?)'
+    r'|(?:at|in|visit|explore)\s+(?P<place_kw>[A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)'
+    r'|(?P<place_sfx>[A-Z][a-zA-Z\s]+?)\s+(?:Beach|Fort|Temple|Market|Palace|Garden|Museum)',
+    re.IGNORECASE,
+)
+# Built once at import; the per-call work in _create_enhanced_prompt is a
+# single .format() instead of re-assembling several KB of static text for
+# each of the three budget variations.
+_ENHANCED_PROMPT_TEMPLATE = textwrap.dedent("""\
+    Create a detailed {duration}-day {style} travel itinerary for {destination}.
+
+    REQUIREMENTS:
+    - Total Budget: ₹{budget} (₹{daily_budget:.0f} per day)
+    - Style: {style_title} (adjust luxury level accordingly)
+    - Themes: {theme_str}
+
+    LOCAL EXPERT RECOMMENDATIONS:
+    {tips_block}
+
+    POPULAR ATTRACTIONS (from travel vlogs):
+    {videos_block}
+
+    FORMAT EXACTLY LIKE THIS:
+
+    Day 1:
+    9:00 AM: Visit Anjuna Beach - Enjoy sunrise and morning walk (₹200, 3 hours)
+    Location: Anjuna Beach, North Goa
+    Details: Beautiful sunrise views, morning yoga, beach cafes for breakfast
+
+    1:00 PM: Explore Fort Aguada - Historical Portuguese fort tour (₹300, 2 hours)
+    Location: Fort Aguada, Candolim
+    Details: 17th-century fort, lighthouse, panoramic sea views
+
+    6:00 PM: Sunset at Baga Beach - Beach activities and dinner (₹800, 4 hours)
+    Location: Baga Beach, North Goa
+    Details: Water sports, beach shacks, famous nightlife area
+
+    Day 2:
+    [Continue same format for all {duration} days]
+
+    COST GUIDELINES ({style}):
+    - Economical: Activities ₹100-500, Food ₹200-400, Hotels ₹1000-2000
+    - Balanced: Activities ₹300-800, Food ₹400-800, Hotels ₹2000-4000
+    - Luxury: Activities ₹500-1500, Food ₹800-2000, Hotels ₹4000-8000
+
+    Include specific place names, exact costs in ₹, and detailed descriptions for each activity.
+""")
+
+# Same treatment as the generation prompt: static text assembled once at
+# import, one .format() per modification call.
+_MODIFICATION_PROMPT_TEMPLATE = textwrap.dedent("""\
+    You are an expert travel planner. I need you to modify an existing travel itinerary based on specific user feedback.
+
+    {original_block}
+
+    MODIFICATION REQUIREMENTS:
+    {modification_context}
+
+    NEW PARAMETERS:
+    - Destination: {destination}
+    - Duration: {duration} days
+    - Budget: ₹{budget} (₹{daily_budget:.0f} per day)
+    - Style: {budget_type}
+    - Themes: {theme_str}
+
+    INSTRUCTIONS:
+    1. Analyze the user's modification request carefully
+    2. Create a NEW itinerary that addresses their specific concerns
+    3. Keep the same destination and duration
+    4. Adjust activities, timing, and budget allocation based on their feedback
+    5. Maintain the quality and completeness of the original itinerary
+    6. Include hotels, transportation, and activities as appropriate
+
+    FORMAT EXACTLY LIKE THIS:
+
+    Day 1:
+    9:00 AM: Visit Charminar - Historic monument and bustling market (₹200, 3 hours)
+    Location: Charminar, Old City
+    Details: Explore the iconic 16th-century monument and surrounding Laad Bazaar for traditional shopping
+
+    1:00 PM: Lunch at Paradise Restaurant - Famous Hyderabadi Biryani (₹800, 2 hours)
+    Location: Paradise Restaurant, Secunderabad
+    Details: Authentic Hyderabadi cuisine experience with world-famous biryani
+
+    [Continue for all days...]
+
+    IMPORTANT:
+    - Address the specific modification request in your new itinerary
+    - Ensure activities are distributed appropriately based on user feedback
+    - Include realistic costs and timing
+    - Provide detailed descriptions for each activity
+    - Include accommodation and transportation recommendations
+""")
+
+_ATTRACTION_UNION = re.compile(
+    r'(?:visit|explore|see)\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)'
+    r'|([A-Z][a-zA-Z\s]+?)\s+(?:Fort|Palace|Temple|Museum|Market|Beach|Lake|Garden)',
+    re.IGNORECASE,
+)
+
+# Required activity fields with their safe defaults; the parser fills a
+# cleaned activity with one dict merge over these. details defaults to
+# None as a sentinel so a missing value can fall back to the title.
+_ACTIVITY_DEFAULTS = {
+    'time': '9:00 AM',
+    'activity': 'Local Activity',
+    'duration': '2-3 hours',
+    'cost': 500,
+    'place': 'Local area',
+    'details': None,
+    'influencer_recommended': False,
+    'youtube_recommended': False,
+    'hotel_recommendation': False,
+    'transport_recommendation': False,
+    'flight_recommendation': False,
+}
+
+# Recommendation flags shared by every stock activity; each literal
+# merges over this instead of repeating five False entries
+_EMPTY_FLAGS = {
+    'influencer_recommended': False,
+    'youtube_recommended': False,
+    'hotel_recommendation': False,
+    'transport_recommendation': False,
+    'flight_recommendation': False,
+}
+
+# Stock attractions served when a response yields nothing parseable
+_DEFAULT_ATTRACTIONS = {
+    'hyderabad': ['Charminar', 'Golconda Fort', 'Hussain Sagar Lake', 'Ramoji Film City', 'Birla Mandir', 'Salar Jung Museum'],
+    'goa': ['Baga Beach', 'Fort Aguada', 'Old Goa Churches', 'Anjuna Beach', 'Dudhsagar Falls', 'Palolem Beach'],
+}
+
+# Curated fallback content is static data; build it once at import
+# instead of re-allocating the nested dicts on every fallback call.
+_FALLBACK_TEMPLATES = {
+    'hyderabad': {
+        'attractions': ['Charminar & Laad Bazaar', 'Golconda Fort', 'Hussain Sagar Lake', 'Ramoji Film City', 'Birla Mandir', 'Salar Jung Museum'],
+        'foods': ['Hyderabadi Biryani', 'Haleem', 'Qubani ka Meetha', 'Irani Chai', 'Kebabs', 'Nihari'],
+        'areas': ['Old City', 'Banjara Hills', 'Jubilee Hills', 'Secunderabad', 'Hitech City', 'Charminar Area'],
+        'hotels': {
+            'Budget-Friendly': [
+                {'name': 'Hotel Sitara Grand', 'price': 1500, 'area': 'Banjara Hills', 'rating': '3-star'},
+                {'name': 'Treebo Trend Amber', 'price': 1800, 'area': 'Gachibowli', 'rating': '3-star'}
+            ],
+            'Standard': [
+                {'name': 'Novotel Hyderabad Airport', 'price': 3500, 'area': 'HITEC City', 'rating': '4-star'},
+                {'name': 'Marriott Hyderabad', 'price': 4000, 'area': 'Tank Bund Road', 'rating': '4-star'}
+            ],
+            'Premium': [
+                {'name': 'Park Hyatt Hyderabad', 'price': 8000, 'area': 'Banjara Hills', 'rating': '5-star'},
+                {'name': 'ITC Kohenur', 'price': 7500, 'area': 'HITEC City', 'rating': '5-star'}
+            ]
+        },
+        'transport': {
+            'Budget-Friendly': {'mode': 'Metro/Bus', 'daily_cost': 200},
+            'Standard': {'mode': 'Cab/Auto', 'daily_cost': 500},
+            'Premium': {'mode': 'Private Car', 'daily_cost': 1000}
+        }
+    },
+    'goa': {
+        'attractions': ['Baga Beach', 'Fort Aguada', 'Basilica of Bom Jesus', 'Anjuna Beach', 'Dudhsagar Falls', 'Palolem Beach'],
+        'foods': ['Fish Curry Rice', 'Bebinca', 'Feni', 'Prawn Balchao', 'Goan Sausage', 'Sol Kadhi'],
+        'areas': ['North Goa', 'South Goa', 'Panaji', 'Old Goa', 'Candolim', 'Calangute'],
+        'hotels': {
+            'Budget-Friendly': [
+                {'name': 'OYO Beach Resort', 'price': 1800, 'area': 'Calangute', 'rating': '3-star'},
+                {'name': 'Zostel Goa', 'price': 1500, 'area': 'Anjuna', 'rating': '3-star'}
+            ],
+            'Standard': [
+                {'name': 'Lemon Tree Hotel', 'price': 4000, 'area': 'Candolim', 'rating': '4-star'},
+                {'name': 'Novotel Goa Resort', 'price': 4500, 'area': 'Dona Paula', 'rating': '4-star'}
+            ],
+            'Premium': [
+                {'name': 'Taj Exotica Resort', 'price': 12000, 'area': 'Benaulim', 'rating': '5-star'},
+                {'name': 'Grand Hyatt Goa', 'price': 10000, 'area': 'Bambolim', 'rating': '5-star'}
+            ]
+        },
+        'transport': {
+            'Budget-Friendly': {'mode': 'Local Bus/Bike Rental', 'daily_cost': 300},
+            'Standard': {'mode': 'Taxi/Scooter Rental', 'daily_cost': 600},
+            'Premium': {'mode': 'Private Car with Driver', 'daily_cost': 1200}
+        }
+    }
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _generic_fallback_template(destination):
+    """Stock template for destinations without curated content, built once per name"""
+    return {
+        'attractions': [f'{destination} Main Attractions', f'{destination} Heritage Sites', f'{destination} Local Markets'],
+        'foods': ['Local Cuisine', 'Street Food', 'Traditional Dishes'],
+        'areas': [f'{destination} City Center', f'{destination} Old Town', f'{destination} Modern Area'],
+        'hotels': {
+            'Budget-Friendly': [{'name': f'Budget Hotel {destination}', 'price': 1200, 'area': f'{destination} Center', 'rating': '3-star'}],
+            'Standard': [{'name': f'Standard Hotel {destination}', 'price': 2500, 'area': f'{destination} Center', 'rating': '4-star'}],
+            'Premium': [{'name': f'Luxury Hotel {destination}', 'price': 5000, 'area': f'{destination} Center', 'rating': '5-star'}]
+        },
+        'transport': {
+            'Budget-Friendly': {'mode': 'Local Bus/Metro', 'daily_cost': 150},
+            'Standard': {'mode': 'Taxi/Auto', 'daily_cost': 400},
+            'Premium': {'mode': 'Private Car', 'daily_cost': 800}
+        }
+    }
+
+
 class AIServiceEnhanced:
     """Enhanced AI service with multiple itinerary generation and natural language processing"""
-    
+
+    # Model probe result shared across instances (and across processes via
+    # the on-disk cache) so re-instantiating the service doesn't re-bill
+    # up to four "Hello" probes against Vertex.
+    _resolved_model = None
+    _resolved_small_model = None
+    _model_lock = threading.Lock()
+    _MODEL_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'travelmind', 'model.json')
+
+    # Generated-response cache shared across instances: identical prompts
+    # (budget bucketing below makes near-identical requests identical)
+    # skip the Vertex round-trip and its token cost entirely.
+    _RESPONSE_CACHE_TTL = 3600
+    _RESPONSE_CACHE_MAX = 256
+    _response_cache = {}
+    _response_cache_lock = threading.Lock()
+
+    # Destination-keyed TTL cache for the external data fetches (BigQuery
+    # recommendations, YouTube content), shared across instances so hot
+    # destinations stop paying the round-trips on every generation.
+    _DEST_CACHE_TTL = 3600
+    _DEST_CACHE_MAX = 256
+    _dest_cache = {}
+    _dest_cache_lock = threading.RLock()
+    # Failed or empty fetches open a short per-key breaker instead of
+    # occupying a cache slot for the full TTL: one BigQuery blip should
+    # not pin an empty recommendation list for an hour. While the
+    # breaker is open, an expired entry is served stale.
+    _DEST_FAIL_TTL = 30
+    _dest_fail_until = {}
+
+    # Gemini context-cache handles for modification turns, keyed by a
+    # hash of the itinerary text they hold and tracked class-side (never
+    # inside the itinerary dict, which crosses session-state and export
+    # boundaries). The server expires the backing cache at its own TTL;
+    # the client view is kept slightly shorter so we never hand out a
+    # handle the server is about to drop.
+    _CONTEXT_CACHE_TTL = 3500
+    _context_caches = {}
+    _context_cache_lock = threading.Lock()
+
     def __init__(self):
         self.project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
         if not self.project_id:
             raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set")
-        
+
         try:
-            # Initialize the GenAI client
-            self.client = genai.Client(
-                project=self.project_id,
-                location=os.getenv('VERTEXAI_LOCATION', 'us-central1')
+            # Initialize the GenAI client (shared across instances)
+            self.client = _get_genai_client(
+                self.project_id,
+                os.getenv('VERTEXAI_LOCATION', 'us-central1')
             )
-            
+
+            self.model_name, self.small_model_name = self._resolve_models()
+
+        except Exception as e:
+            print(f"Enhanced AI service initialization failed: {str(e)}")
+            raise Exception(f"Failed to initialize Enhanced AI service: {str(e)}")
+
+    @functools.cached_property
+    def bq_client(self):
+        """BigQuery client, built lazily on first query (not on the itinerary hot path)"""
+        return _get_bq_client()
+
+    @functools.cached_property
+    def youtube_service(self):
+        """YouTube client, built lazily on first fetch and reused after
+
+        Constructing it per call paid the googleapiclient discovery cost
+        (disk read + schema parse) on every cache miss.
+        """
+        return YouTubeService()
+
+    def _probe_models(self, candidates):
+        """Return the first model in candidates that answers a tiny probe, or None"""
+        for model in candidates:
+            try:
+                test_response = self.client.models.generate_content(
+                    model=model,
+                    contents="Hello",
+                    config=GenerateContentConfig(
+                        candidate_count=1,
+                        max_output_tokens=10
+                    )
+                )
+                if test_response and test_response.candidates:
+                    return model
+            except Exception:
+                continue
+        return None
+
+    def _resolve_models(self, force=False):
+        """Resolve the main and small Gemini models, probing at most once per process.
+
+        The small model handles terse sub-tasks like intent analysis,
+        where flash-lite tier latency and pricing are a better fit than
+        the main generation model.
+        """
+        cls = AIServiceEnhanced
+        with cls._model_lock:
+            if cls._resolved_model and not force:
+                return cls._resolved_model, cls._resolved_small_model or cls._resolved_model
+
+            cache_key = f"{self.project_id}/{os.getenv('VERTEXAI_LOCATION', 'us-central1')}"
+
+            # Disk cache lets fresh workers skip the probe entirely
+            if not force:
+                try:
+                    with open(cls._MODEL_CACHE_PATH) as f:
+                        cached = json.load(f)
+                    if cached.get('key') == cache_key and cached.get('model'):
+                        cls._resolved_model = cached['model']
+                        cls._resolved_small_model = cached.get('small_model') or cached['model']
+                        return cls._resolved_model, cls._resolved_small_model
+                except (OSError, ValueError):
+                    pass
+
             # Test available models
             available_models = [
                 "gemini-2.5-flash",
-                "gemini-1.5-flash", 
+                "gemini-1.5-flash",
                 "gemini-1.5-pro",
                 "gemini-pro"
             ]
-            
-            self.model_name = None
-            for model in available_models:
-                try:
-                    test_response = self.client.models.generate_content(
-                        model=model,
-                        contents="Hello",
-                        config=GenerateContentConfig(
-                            candidate_count=1,
-                            max_output_tokens=10
-                        )
-                    )
-                    if test_response and test_response.candidates:
-                        self.model_name = model
-                        print(f"✅ Successfully initialized Enhanced AI with model: {model}")
-                        break
-                except Exception as e:
-                    continue
-            
-            if not self.model_name:
+            small_candidates = [
+                "gemini-2.5-flash-lite",
+                "gemini-2.0-flash-lite",
+                "gemini-1.5-flash-8b"
+            ]
+
+            model_name = self._probe_models(available_models)
+            if not model_name:
                 raise Exception("No GenAI models are available")
-            
-            self.bq_client = bigquery.Client()
-                
-        except Exception as e:
-            print(f"Enhanced AI service initialization failed: {str(e)}")
-            raise Exception(f"Failed to initialize Enhanced AI service: {str(e)}")
+            print(f"✅ Successfully initialized Enhanced AI with model: {model_name}")
+
+            small_model_name = self._probe_models(small_candidates) or model_name
+            if small_model_name != model_name:
+                print(f"⚡ Using {small_model_name} for lightweight sub-tasks")
+
+            cls._resolved_model = model_name
+            cls._resolved_small_model = small_model_name
+            try:
+                os.makedirs(os.path.dirname(cls._MODEL_CACHE_PATH), exist_ok=True)
+                tmp_path = cls._MODEL_CACHE_PATH + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({'key': cache_key, 'model': model_name, 'small_model': small_model_name}, f)
+                os.replace(tmp_path, cls._MODEL_CACHE_PATH)
+            except OSError:
+                pass
+
+            return model_name, small_model_name
     
     def generate_multiple_itineraries(self, destination, duration, budget, themes, num_options=3):
         """Generate multiple itinerary options with varying budgets and styles"""
@@ -74,41 +478,33 @@ class AIServiceEnhanced:
                 {"budget": int(budget * 1.3), "type": "Premium", "style": "luxury"}
             ]
             
-            itinerary_options = []
-            
-            for i, budget_option in enumerate(budget_variations):
-                try:
-                    print(f"  📋 Generating {budget_option['type']} option (₹{budget_option['budget']})")
-                    
-                    # Create specific prompt for this budget/style
-                    prompt = self._create_enhanced_prompt(
-                        destination, duration, budget_option['budget'], 
-                        themes, budget_option['style'], influencer_recommendations, youtube_content
+            # Rendered once here: identical across all three budget variations
+            tips_block = self._render_tips_block(influencer_recommendations)
+            videos_block = self._render_videos_block(youtube_content)
+
+            # Each option is an independent prompt + Vertex round-trip, so fan
+            # them out concurrently: wall time is max(call) instead of sum(call)
+            async def _fan_out():
+                tasks = [
+                    asyncio.to_thread(
+                        self._generate_one_option,
+                        destination, duration, budget_option, themes,
+                        influencer_recommendations, youtube_content,
+                        tips_block, videos_block
                     )
-                    
-                    # Generate with Gemini
-                    response = self._generate_with_gemini(prompt)
-                    
-                    if response:
-                        print(f"    📝 Gemini response length: {len(response)} characters")
-                        print(f"    📝 First 200 chars: {response[:200]}...")
-                        
-                        itinerary = self._parse_gemini_response(
-                            response, destination, duration, budget_option['budget'], 
-                            budget_option['type'], influencer_recommendations, youtube_content
-                        )
-                        if itinerary and itinerary.get('daily_plans'):
-                            itinerary_options.append(itinerary)
-                            print(f"    ✅ Successfully parsed {budget_option['type']} itinerary")
-                        else:
-                            print(f"    ❌ Failed to parse {budget_option['type']} itinerary - no daily plans")
-                    else:
-                        print(f"    ❌ No response from Gemini for {budget_option['type']} option")
-                    
-                except Exception as e:
-                    print(f"    ❌ Failed to generate {budget_option['type']} option: {str(e)}")
-                    continue
-            
+                    for budget_option in budget_variations
+                ]
+                return await asyncio.gather(*tasks, return_exceptions=True)
+
+            results = asyncio.run(_fan_out())
+
+            itinerary_options = []
+            for budget_option, result in zip(budget_variations, results):
+                if isinstance(result, Exception):
+                    print(f"    ❌ Failed to generate {budget_option['type']} option: {str(result)}")
+                elif result:
+                    itinerary_options.append(result)
+
             # If no AI options generated, create fallback options
             if not itinerary_options:
                 print("🔄 Creating fallback options using templates")
@@ -122,26 +518,118 @@ class AIServiceEnhanced:
             print(f"Error generating multiple itineraries: {str(e)}")
             return []
     
-    def generate_itinerary(self, destination, duration, budget, themes):
-        """Main itinerary generation method - returns best option from multiple choices"""
+    def _generate_one_option(self, destination, duration, budget_option, themes, influencer_recs, youtube_content, tips_block, videos_block):
+        """Generate and parse a single budget-variation option (runs in a worker thread)"""
+        print(f"  📋 Generating {budget_option['type']} option (₹{budget_option['budget']})")
+
+        # Create specific prompt for this budget/style
+        prompt = self._create_enhanced_prompt(
+            destination, duration, budget_option['budget'],
+            themes, budget_option['style'], tips_block, videos_block
+        )
+
+        # Generate with Gemini, parsing Day blocks while tokens stream in
+        response, streamed_plans = self._generate_and_parse_stream(
+            prompt, duration, influencer_recs, youtube_content
+        )
+        if response is None:
+            # Streaming failed - fall back to the buffered call
+            response = self._generate_with_gemini(prompt)
+
+        if not response:
+            print(f"    ❌ No response from Gemini for {budget_option['type']} option")
+            return None
+
+        print(f"    📝 Gemini response length: {len(response)} characters")
+        print(f"    📝 First 200 chars: {response[:200]}...")
+
+        itinerary = self._parse_gemini_response(
+            response, destination, duration, budget_option['budget'],
+            budget_option['type'], influencer_recs, youtube_content,
+            daily_plans=streamed_plans
+        )
+        if itinerary and itinerary.get('daily_plans'):
+            print(f"    ✅ Successfully parsed {budget_option['type']} itinerary")
+            return itinerary
+
+        print(f"    ❌ Failed to parse {budget_option['type']} itinerary - no daily plans")
+        return None
+
+    def generate_itinerary(self, destination, duration, budget, themes, generate_alternatives=False):
+        """Main itinerary generation method.
+
+        By default generates only the Standard option for the target
+        budget - one Gemini call instead of three. Pass
+        generate_alternatives=True to produce the full Budget-Friendly/
+        Standard/Premium spread for callers that surface choices.
+        """
+        if not generate_alternatives:
+            option = self._generate_standard_option(destination, duration, budget, themes)
+            if option:
+                option['all_options'] = [option]
+                return option
+            # Fall through to the multi-option path, whose template
+            # fallbacks guarantee a result
+
         options = self.generate_multiple_itineraries(destination, duration, budget, themes)
-        
+
         if not options:
             raise Exception("Failed to generate any itinerary options")
-        
+
         # Select best option based on budget
         best_option = self._select_best_option(options, budget)
         best_option['all_options'] = options  # Store all options for user choice
-        
+
         return best_option
+
+    def _generate_standard_option(self, destination, duration, budget, themes):
+        """Fast path: generate just the Standard option at the target budget"""
+        print(f"🎯 Generating single Standard itinerary for {destination}")
+        try:
+            influencer_recs = self._get_influencer_recommendations(destination)
+            youtube_content = self._get_youtube_content(destination)
+            tips_block = self._render_tips_block(influencer_recs)
+            videos_block = self._render_videos_block(youtube_content)
+            return self._generate_one_option(
+                destination, duration,
+                {"budget": budget, "type": "Standard", "style": "balanced"},
+                themes, influencer_recs, youtube_content, tips_block, videos_block
+            )
+        except Exception as e:
+            print(f"Error generating standard option: {str(e)}")
+            return None
     
     def modify_itinerary(self, current_itinerary, user_request):
         """Modify existing itinerary based on natural language input using AI intent analysis"""
         try:
             print(f"🔧 Processing modification request: {user_request}")
-            
-            # Step 1: Use Gemini to analyze user intent and extract modification parameters
-            intent_analysis = self._analyze_modification_intent(current_itinerary, user_request)
+
+            # Step 1: Analyze intent with Gemini, time-boxed. The template
+            # fallback plans are built speculatively in parallel so that if
+            # regeneration later degrades to them, they're already cached.
+            async def _analyze_with_speculation():
+                intent_task = asyncio.create_task(asyncio.to_thread(
+                    self._analyze_modification_intent, current_itinerary, user_request
+                ))
+                fallback_task = asyncio.create_task(asyncio.to_thread(
+                    self._create_enhanced_fallback_plans,
+                    current_itinerary['destination'],
+                    current_itinerary['duration'],
+                    current_itinerary['budget'],
+                    current_itinerary.get('budget_type', 'Standard')
+                ))
+                try:
+                    intent = await asyncio.wait_for(intent_task, timeout=8)
+                except asyncio.TimeoutError:
+                    print("⚠️ Intent analysis timed out, proceeding with defaults")
+                    intent = {}
+                except Exception as e:
+                    print(f"⚠️ Intent analysis failed ({str(e)}), proceeding with defaults")
+                    intent = {}
+                await asyncio.gather(fallback_task, return_exceptions=True)
+                return intent
+
+            intent_analysis = asyncio.run(_analyze_with_speculation())
             print(f"🧠 Intent analysis: {intent_analysis}")
             
             # Step 2: Generate new itinerary with updated context based on intent
@@ -149,6 +637,10 @@ class AIServiceEnhanced:
             
             modified_itinerary['modification_applied'] = user_request
             print(f"✅ Successfully modified itinerary using AI intent analysis")
+
+            # The base itinerary's context cache stays registered so
+            # further turns on the same base reuse it; the server drops
+            # it when its TTL lapses
             return modified_itinerary
                 
         except Exception as e:
@@ -168,44 +660,62 @@ class AIServiceEnhanced:
         
         USER MODIFICATION REQUEST: "{user_request}"
         
-        Please analyze the user's intent and provide a structured response with these parameters:
-        
-        1. MODIFICATION_TYPE: (redistribute_activities, add_theme, change_budget, modify_day, change_accommodation, add_activities, remove_activities, change_focus)
-        2. SPECIFIC_CHANGES: What exactly needs to be changed
-        3. NEW_THEMES: Any new themes to add (adventure, food, culture, nature, luxury, budget, etc.)
-        4. BUDGET_ADJUSTMENT: (increase, decrease, maintain) and percentage if applicable
-        5. DAY_FOCUS: Specific day number if mentioned, or "all" for general changes
-        6. ACTIVITY_DISTRIBUTION: (even, front_loaded, back_loaded, maintain) 
-        7. ACCOMMODATION_PREFERENCE: (budget, standard, luxury, maintain)
-        8. ADDITIONAL_CONTEXT: Any other specific requirements
-        
-        Respond in this exact format:
-        MODIFICATION_TYPE: [type]
-        SPECIFIC_CHANGES: [description]
-        NEW_THEMES: [themes separated by commas]
-        BUDGET_ADJUSTMENT: [adjustment]
-        DAY_FOCUS: [day or all]
-        ACTIVITY_DISTRIBUTION: [distribution]
-        ACCOMMODATION_PREFERENCE: [preference]
-        ADDITIONAL_CONTEXT: [context]
+        Respond with a single JSON object containing exactly these keys:
+        - "modification_type": one of redistribute_activities, add_theme, change_budget, modify_day, change_accommodation, add_activities, remove_activities, change_focus
+        - "specific_changes": what exactly needs to be changed
+        - "new_themes": list of new themes to add (adventure, food, culture, nature, luxury, budget, etc.), empty list if none
+        - "budget_adjustment": one of increase, decrease, maintain
+        - "day_focus": specific day number if mentioned, or "all" for general changes
+        - "activity_distribution": one of even, front_loaded, back_loaded, maintain
+        - "accommodation_preference": one of budget, standard, luxury, maintain
+        - "additional_context": any other specific requirements
         """
-        
-        response = self._generate_with_gemini(intent_prompt)
-        return self._parse_intent_response(response) if response else {}
+
+        # JSON mode is terser and machine-parseable, so a small budget, low
+        # temperature and the flash-lite tier model are enough
+        config = GenerateContentConfig(
+            candidate_count=1,
+            response_mime_type="application/json",
+            max_output_tokens=512,
+            temperature=0.2
+        )
+        response = self._generate_with_gemini(
+            intent_prompt, config=config, model_override=self.small_model_name
+        )
+        if not response:
+            return {}
+
+        try:
+            intent = json.loads(response)
+        except ValueError:
+            # Model ignored JSON mode - fall back to line-based parsing
+            return self._parse_intent_response(response)
+
+        if not isinstance(intent, dict):
+            return {}
+
+        intent = {str(k).strip().lower().replace(' ', '_'): v for k, v in intent.items()}
+        # Downstream consumers expect new_themes as a comma-separated string
+        themes = intent.get('new_themes')
+        if isinstance(themes, list):
+            intent['new_themes'] = ', '.join(str(t) for t in themes)
+        return intent
     
     def _summarize_current_itinerary(self, itinerary):
         """Create a concise summary of the current itinerary"""
-        summary = f"Destination: {itinerary['destination']}\n"
-        summary += f"Duration: {itinerary['duration']} days\n"
-        summary += f"Budget: ₹{itinerary['budget']}\n"
-        summary += f"Budget Type: {itinerary.get('budget_type', 'Standard')}\n\n"
-        
+        parts = [
+            f"Destination: {itinerary['destination']}\n",
+            f"Duration: {itinerary['duration']} days\n",
+            f"Budget: ₹{itinerary['budget']}\n",
+            f"Budget Type: {itinerary.get('budget_type', 'Standard')}\n\n",
+        ]
+
         for day_plan in itinerary['daily_plans']:
-            activity_count = len([a for a in day_plan['activities'] 
+            activity_count = len([a for a in day_plan['activities']
                                 if not a.get('hotel_recommendation') and not a.get('flight_recommendation')])
-            summary += f"Day {day_plan['day']}: {activity_count} activities\n"
-        
-        return summary
+            parts.append(f"Day {day_plan['day']}: {activity_count} activities\n")
+
+        return ''.join(parts)
     
     def _parse_intent_response(self, response):
         """Parse the structured intent analysis response"""
@@ -213,8 +723,7 @@ class AIServiceEnhanced:
         if not response:
             return intent
             
-        lines = response.strip().split('\n')
-        for line in lines:
+        for line in response.splitlines():
             if ':' in line:
                 key, value = line.split(':', 1)
                 key = key.strip().lower().replace(' ', '_')
@@ -263,6 +772,10 @@ class AIServiceEnhanced:
         
         # Generate new itinerary using the enhanced AI service with modification context
         try:
+            # Bill the unchanged itinerary text once via context caching;
+            # only the modification delta rides in each prompt
+            cache_name = self._get_itinerary_context_cache(original_itinerary)
+
             # Create enhanced prompt that includes modification context
             enhanced_prompt = self._create_modification_prompt(
                 original_itinerary['destination'],
@@ -271,11 +784,21 @@ class AIServiceEnhanced:
                 budget_type,
                 new_themes if new_themes else ['General'],
                 modification_context,
-                original_itinerary
+                None if cache_name else original_itinerary
             )
-            
+
+            config = None
+            if cache_name:
+                config = GenerateContentConfig(
+                    candidate_count=1,
+                    max_output_tokens=2048,
+                    temperature=0.8,
+                    top_p=0.9,
+                    cached_content=cache_name
+                )
+
             # Generate with Gemini
-            response = self._generate_with_gemini(enhanced_prompt)
+            response = self._generate_with_gemini(enhanced_prompt, config=config)
             
             if response:
                 # Parse the response
@@ -299,563 +822,325 @@ class AIServiceEnhanced:
                     )
                     modified_itinerary = {
                         'destination': original_itinerary['destination'],
-                        'duration': original_itinerary['duration'],
-                        'budget': adjusted_budget,
-                        'budget_type': budget_type,
-                        'daily_plans': modified_itinerary
-                    }
-                
-                return modified_itinerary
-            else:
-                raise Exception("No response from Gemini")
-            
-        except Exception as e:
-            print(f"❌ Error in regeneration: {str(e)}")
-            return original_itinerary
-    
-    def _create_modification_prompt(self, destination, duration, budget, budget_type, themes, modification_context, original_itinerary):
-        """Create a specialized prompt for itinerary modification"""
-        theme_str = ', '.join(themes) if themes else 'general exploration'
-        daily_budget = budget / duration
-        
-        # Get current itinerary summary for reference
-        current_summary = self._itinerary_to_text(original_itinerary)
-        
-        prompt = f"""
-        You are an expert travel planner. I need you to modify an existing travel itinerary based on specific user feedback.
-        
-        ORIGINAL ITINERARY:
-        {current_summary}
-        
-        MODIFICATION REQUIREMENTS:
-        {modification_context}
-        
-        NEW PARAMETERS:
-        - Destination: {destination}
-        - Duration: {duration} days
-        - Budget: ₹{budget} (₹{daily_budget:.0f} per day)
-        - Style: {budget_type}
-        - Themes: {theme_str}
-        
-        INSTRUCTIONS:
-        1. Analyze the user's modification request carefully
-        2. Create a NEW itinerary that addresses their specific concerns
-        3. Keep the same destination and duration
-        4. Adjust activities, timing, and budget allocation based on their feedback
-        5. Maintain the quality and completeness of the original itinerary
-        6. Include hotels, transportation, and activities as appropriate
-        
-        FORMAT EXACTLY LIKE THIS:
-        
-        Day 1:
-        9:00 AM: Visit Charminar - Historic monument and bustling market (₹200, 3 hours)
-        Location: Charminar, Old City
-        Details: Explore the iconic 16th-century monument and surrounding Laad Bazaar for traditional shopping
-        
-        1:00 PM: Lunch at Paradise Restaurant - Famous Hyderabadi Biryani (₹800, 2 hours)
-        Location: Paradise Restaurant, Secunderabad
-        Details: Authentic Hyderabadi cuisine experience with world-famous biryani
-        
-        [Continue for all days...]
-        
-        IMPORTANT:
-        - Address the specific modification request in your new itinerary
-        - Ensure activities are distributed appropriately based on user feedback
-        - Include realistic costs and timing
-        - Provide detailed descriptions for each activity
-        - Include accommodation and transportation recommendations
-        """
-        
-        return prompt
-    
-    # Note: Old hardcoded modification methods removed in favor of AI-powered intent analysis
-    # The system now uses Gemini to understand user intent and regenerate itineraries accordingly
-    
-    def _extract_attractions_from_text(self, response_text, destination):
-        """Extract attractions from Gemini response text"""
-        attractions = []
-        
-        # Common attraction patterns
-        patterns = [
-            r'visit\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'explore\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'([A-Z][a-zA-Z\s]+?)\s+(?:Fort|Temple|Beach|Market|Palace|Museum)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, response_text, re.IGNORECASE)
-            for match in matches:
-                clean_match = match.strip()
-                if len(clean_match) > 3 and len(clean_match) < 30:
-                    attractions.append(clean_match)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_attractions = []
-        for attraction in attractions:
-            if attraction.lower() not in seen:
-                seen.add(attraction.lower())
-                unique_attractions.append(attraction)
-        
-        # If no attractions found, use destination-specific defaults
-        if not unique_attractions:
-            if destination.lower() == 'hyderabad':
-                attractions = ['Charminar', 'Golconda Fort', 'Hussain Sagar Lake', 'Ramoji Film City', 'Birla Mandir', 'Salar Jung Museum']
-            elif destination.lower() == 'goa':
-                attractions = ['Baga Beach', 'Fort Aguada', 'Old Goa Churches', 'Anjuna Beach', 'Dudhsagar Falls', 'Palolem Beach']
-            else:
-                attractions = [f'{destination} City Center', f'{destination} Market', f'{destination} Heritage Sites']
-        
-        return attractions[:9]  # Limit to 9 attractions (3 per day for 3 days)
-    
-    def _create_enhanced_prompt(self, destination, duration, budget, themes, style, influencer_recs, youtube_content):
-        """Create detailed prompt for Gemini generation"""
-        theme_str = ', '.join(themes) if themes else 'general exploration'
-        daily_budget = budget / duration
-        
-        # Process recommendations
-        influencer_tips = []
-        if influencer_recs:
-            for rec in influencer_recs[:5]:  # Limit to top 5
-                influencer_tips.append(f"- {rec['place']}: {rec['tip']} (Budget: {rec['budget_range']}, Best time: {rec['best_time']})")
-        
-        youtube_insights = []
-        if youtube_content:
-            for video in youtube_content[:3]:  # Limit to top 3
-                if video.get('locations'):
-                    for location in video['locations'][:2]:
-                        youtube_insights.append(f"- {location} (Featured in: {video['title']})")
-        
-        prompt = f"""
-        Create a detailed {duration}-day {style} travel itinerary for {destination}.
-        
-        REQUIREMENTS:
-        - Total Budget: ₹{budget} (₹{daily_budget:.0f} per day)
-        - Style: {style.title()} (adjust luxury level accordingly)
-        - Themes: {theme_str}
-        
-        LOCAL EXPERT RECOMMENDATIONS:
-        {chr(10).join(influencer_tips) if influencer_tips else "No local recommendations available"}
-        
-        POPULAR ATTRACTIONS (from travel vlogs):
-        {chr(10).join(youtube_insights) if youtube_insights else "No video recommendations available"}
-        
-        FORMAT EXACTLY LIKE THIS:
-        
-        Day 1:
-        9:00 AM: Visit Anjuna Beach - Enjoy sunrise and morning walk (₹200, 3 hours)
-        Location: Anjuna Beach, North Goa
-        Details: Beautiful sunrise views, morning yoga, beach cafes for breakfast
-        
-        1:00 PM: Explore Fort Aguada - Historical Portuguese fort tour (₹300, 2 hours)  
-        Location: Fort Aguada, Candolim
-        Details: 17th-century fort, lighthouse, panoramic sea views
-        
-        6:00 PM: Sunset at Baga Beach - Beach activities and dinner (₹800, 4 hours)
-        Location: Baga Beach, North Goa
-        Details: Water sports, beach shacks, famous nightlife area
-        
-        Day 2:
-        [Continue same format for all {duration} days]
-        
-        COST GUIDELINES ({style}):
-        - Economical: Activities ₹100-500, Food ₹200-400, Hotels ₹1000-2000
-        - Balanced: Activities ₹300-800, Food ₹400-800, Hotels ₹2000-4000  
-        - Luxury: Activities ₹500-1500, Food ₹800-2000, Hotels ₹4000-8000
-        
-        Include specific place names, exact costs in ₹, and detailed descriptions for each activity.
-        """
-        
-        return prompt
-    
-    def _generate_with_gemini(self, prompt):
-        """Generate content using Gemini with rate limiting"""
-        try:
-            import time
-            time.sleep(1)  # Rate limiting
-            
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=GenerateContentConfig(
-                    candidate_count=1,
-                    max_output_tokens=2048,
-                    temperature=0.8,
-                    top_p=0.9
-                )
-            )
-            
-            if response and response.candidates:
-                response_text = ""
-                for part in response.candidates[0].content.parts:
-                    if part.text:
-                        response_text += part.text
-                return response_text
-            
-            return None
-            
-        except Exception as e:
-            print(f"Gemini generation error: {str(e)}")
-            return None
-    
-    def _parse_gemini_response(self, response_text, destination, duration, budget, budget_type, influencer_recs, youtube_content):
-        """Parse Gemini response into structured itinerary"""
-        try:
-            print(f"    🔍 Parsing response for {budget_type}: {len(response_text)} chars")
-            
-            # Extract daily activities using regex patterns
-            daily_plans = []
-            
-            # Try multiple parsing approaches
-            # Approach 1: Look for "Day X" patterns
-            day_pattern = r'Day\s*(\d+)[:.]?\s*(.*?)(?=Day\s*\d+|$)'
-            day_matches = re.findall(day_pattern, response_text, re.DOTALL | re.IGNORECASE)
-            
-            print(f"    📋 Found {len(day_matches)} day matches using Day pattern")
-            
-            if day_matches:
-                for day_num, day_content in day_matches:
-                    if int(day_num) > duration:
-                        break
-                        
-                    activities = self._extract_activities_from_text(day_content, influencer_recs, youtube_content)
-                    
-                    if activities:
-                        daily_plans.append({
-                            'day': int(day_num),
-                            'activities': activities
-                        })
-                        print(f"      ✅ Day {day_num}: {len(activities)} activities")
-                    else:
-                        print(f"      ❌ Day {day_num}: No activities extracted")
-            
-            # Approach 2: If no structured days found, use enhanced fallback with hotels/transport
-            if not daily_plans:
-                print(f"    🔄 No structured days found, using enhanced fallback with hotels/transport")
-                daily_plans = self._create_enhanced_fallback_plans(
-                    destination, duration, budget, budget_type
-                )
-            
-            # Approach 3: If still no plans, use enhanced fallback
-            if not daily_plans:
-                print(f"    🔄 Using enhanced fallback for {destination}")
-                daily_plans = self._create_enhanced_fallback_plans(destination, duration, budget, budget_type)
-            
-            # Calculate total cost
-            total_cost = sum(
-                sum(activity.get('cost', 0) for activity in day['activities'])
-                for day in daily_plans
-            )
-            
-            result = {
-                'destination': destination,
-                'duration': duration,
-                'budget': budget,
-                'budget_type': budget_type,
-                'total_cost': total_cost,
-                'daily_plans': daily_plans,
-                'ai_generated': True,
-                'data_sources': {
-                    'gemini_ai': True,
-                    'influencer_recs': len(influencer_recs) if influencer_recs else 0,
-                    'youtube_content': len(youtube_content) if youtube_content else 0
-                }
-            }
-            
-            print(f"    ✅ Generated {budget_type} itinerary: {len(daily_plans)} days, ₹{total_cost}")
-            return result
-            
-        except Exception as e:
-            print(f"    ❌ Error parsing response: {str(e)}")
-            return None
-    
-    def _extract_activities_from_text(self, day_content, influencer_recs, youtube_content):
-        """Extract structured activities from day content text"""
-        activities = []
-        
-        # Common time patterns
-        time_patterns = [
-            r'(\d{1,2}:\d{2}\s*(?:AM|PM))',
-            r'(\d{1,2}\s*(?:AM|PM))',
-            r'(Morning|Afternoon|Evening|Night)',
-            r'(\d{1,2}-\d{1,2}\s*(?:AM|PM))',
-        ]
-        
-        # Extract activities with time, cost, and description
-        lines = day_content.split('\n')
-        current_activity = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line or len(line) < 3:
-                continue
-            
-            # Check for time indicators
-            time_found = False
-            for pattern in time_patterns:
-                time_match = re.search(pattern, line, re.IGNORECASE)
-                if time_match:
-                    # Save previous activity
-                    if current_activity and current_activity.get('activity'):
-                        activities.append(current_activity)
-                    
-                    # Start new activity
-                    current_activity = {
-                        'time': time_match.group(1),
-                        'activity': line.replace(time_match.group(1), '').strip(' :-'),
-                        'duration': self._extract_duration(line),
-                        'cost': self._extract_cost(line),
-                        'place': self._extract_place(line),
-                        'details': line,
-                        'influencer_recommended': self._check_influencer_match(line, influencer_recs),
-                        'youtube_recommended': self._check_youtube_match(line, youtube_content),
-                        'hotel_recommendation': False,
-                        'transport_recommendation': False,
-                        'flight_recommendation': False
+                        'duration': original_itinerary['duration'],
+                        'budget': adjusted_budget,
+                        'budget_type': budget_type,
+                        'daily_plans': modified_itinerary
                     }
-                    time_found = True
-                    break
+                
+                return modified_itinerary
+            else:
+                raise Exception("No response from Gemini")
             
-            if not time_found and current_activity:
-                # Add to current activity details
-                current_activity['details'] += ' ' + line
-                # Update place and cost if found in additional lines
-                if not current_activity.get('place'):
-                    current_activity['place'] = self._extract_place(line)
-                if not current_activity.get('cost') or current_activity.get('cost') == 0:
-                    current_activity['cost'] = self._extract_cost(line)
-        
-        # Add the last activity
-        if current_activity and current_activity.get('activity'):
-            activities.append(current_activity)
-        
-        # Ensure all activities have required fields
-        for activity in activities:
-            activity.setdefault('time', '9:00 AM')
-            activity.setdefault('duration', '2 hours')
-            activity.setdefault('cost', 500)
-            activity.setdefault('place', 'Local Area')
-            activity.setdefault('details', activity.get('activity', 'Activity'))
-            activity.setdefault('influencer_recommended', False)
-            activity.setdefault('youtube_recommended', False)
-            activity.setdefault('hotel_recommendation', False)
-            activity.setdefault('transport_recommendation', False)
-            activity.setdefault('flight_recommendation', False)
-        
-        return activities
-    
-    def _extract_cost(self, text):
-        """Extract cost from text"""
-        import random
-        cost_patterns = [
-            r'₹(\d+(?:,\d+)*)',
-            r'Rs\.?\s*(\d+(?:,\d+)*)',
-            r'INR\s*(\d+(?:,\d+)*)',
-            r'\$(\d+(?:,\d+)*)',
-            r'(\d+(?:,\d+)*)\s*(?:rupees|rs|inr)',
-        ]
-        
-        for pattern in cost_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                cost_str = match.group(1).replace(',', '')
-                return int(cost_str)
-        
-        return random.randint(200, 2000)  # Default random cost
+        except Exception as e:
+            print(f"❌ Error in regeneration: {str(e)}")
+            return original_itinerary
     
-    def _extract_duration(self, text):
-        """Extract duration from text"""
-        duration_patterns = [
-            r'(\d+)\s*hours?',
-            r'(\d+)\s*hrs?',
-            r'(\d+)\s*h',
-            r'(\d+)-(\d+)\s*hours?',
-            r'half\s*day',
-            r'full\s*day',
-            r'whole\s*day',
-        ]
-        
-        for pattern in duration_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if 'half' in pattern:
-                    return "4 hours"
-                elif 'full' in pattern or 'whole' in pattern:
-                    return "8 hours"
-                elif len(match.groups()) > 1:  # Range like "2-3 hours"
-                    return f"{match.group(1)}-{match.group(2)} hours"
-                else:
-                    return f"{match.group(1)} hours"
-        
-        return "2-3 hours"  # Default duration
+    def _get_itinerary_context_cache(self, itinerary):
+        """Create (once) and return the Gemini context cache holding this itinerary's text.
+
+        The itinerary prefix is identical across every modification turn
+        on the same base itinerary, so caching it server-side pays its
+        input tokens once and later turns reuse the handle until the
+        server TTL lapses. Returns None when context caching is
+        unavailable; callers then inline the itinerary text as before.
+        """
+        itinerary_text = "ORIGINAL ITINERARY:\n" + self._itinerary_to_text(itinerary)
+        cache_key = hashlib.blake2b(itinerary_text.encode('utf-8'), digest_size=16).hexdigest()
+        now = time.monotonic()
+        cls = AIServiceEnhanced
+
+        with cls._context_cache_lock:
+            entry = cls._context_caches.get(cache_key)
+            if entry and now - entry[1] < cls._CONTEXT_CACHE_TTL:
+                return entry[0]
+
+        try:
+            cache = self.client.caches.create(
+                model=self.model_name,
+                config={
+                    'contents': [itinerary_text],
+                    'ttl': '3600s'
+                }
+            )
+            with cls._context_cache_lock:
+                cls._context_caches[cache_key] = (cache.name, now)
+            return cache.name
+        except Exception as e:
+            print(f"Context cache creation failed, inlining itinerary: {str(e)}")
+            return None
+
+    def _create_modification_prompt(self, destination, duration, budget, budget_type, themes, modification_context, original_itinerary=None):
+        """Create a specialized prompt for itinerary modification.
+
+        When original_itinerary is None the itinerary text is already in
+        the model's cached context and is omitted from the prompt.
+        """
+        theme_str = ', '.join(themes) if themes else 'general exploration'
+        daily_budget = budget / duration
+
+        if original_itinerary is not None:
+            original_block = f"ORIGINAL ITINERARY:\n{self._itinerary_to_text(original_itinerary)}"
+        else:
+            original_block = "The ORIGINAL ITINERARY is provided in your cached context."
+
+        return _MODIFICATION_PROMPT_TEMPLATE.format(
+            original_block=original_block,
+            modification_context=modification_context,
+            destination=destination,
+            duration=duration,
+            budget=budget,
+            daily_budget=daily_budget,
+            budget_type=budget_type,
+            theme_str=theme_str,
+        )
     
-    def _extract_place(self, text):
-        """Extract place/location from text"""
-        # Common location indicators
-        location_patterns = [
-            r'Location:\s*([A-Z][a-zA-Z\s,]+?)(?:\n|$)',
-            r'at\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'in\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'visit\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'explore\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'([A-Z][a-zA-Z\s]+?)\s+(?:Beach|Fort|Temple|Market|Palace|Garden|Museum)',
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                place = match.group(1).strip()
-                if len(place) > 2 and len(place) < 50:  # Reasonable place name length
-                    return place
-        
-        return ""  # Return empty string if no place found
+    # Note: Old hardcoded modification methods removed in favor of AI-powered intent analysis
+    # The system now uses Gemini to understand user intent and regenerate itineraries accordingly
     
-    def _create_enhanced_prompt(self, destination, duration, budget, themes, style, influencer_recs, youtube_content):
+    @staticmethod
+    def _bucket_budget(budget):
+        """Quantize a budget into log-spaced bands.
+
+        Near-identical budgets (₹30,000 vs ₹30,400) would otherwise
+        produce distinct prompts and defeat the response cache.
+        """
+        if budget < 10000:
+            step = 500
+        elif budget < 50000:
+            step = 2000
+        else:
+            step = 5000
+        return max(step, int(round(budget / step)) * step)
+
+    @staticmethod
+    def _render_tips_block(influencer_recs):
+        """Render the influencer tips prompt block (identical across budget variations)"""
+        if not influencer_recs:
+            return "No local recommendations available"
+        return '\n'.join(
+            f"- {rec['place']}: {rec['tip']} (Budget: {rec['budget_range']}, Best time: {rec['best_time']})"
+            for rec in influencer_recs[:5]  # Limit to top 5
+        )
+
+    @staticmethod
+    def _render_videos_block(youtube_content):
+        """Render the YouTube attractions prompt block (identical across budget variations)"""
+        youtube_insights = []
+        for video in (youtube_content or [])[:3]:  # Limit to top 3
+            if video.get('locations'):
+                for location in video['locations'][:2]:
+                    youtube_insights.append(f"- {location} (Featured in: {video['title']})")
+        return '\n'.join(youtube_insights) if youtube_insights else "No video recommendations available"
+
+    def _create_enhanced_prompt(self, destination, duration, budget, themes, style, tips_block, videos_block):
         """Create detailed prompt for Gemini generation"""
         theme_str = ', '.join(themes) if themes else 'general exploration'
+        budget = self._bucket_budget(budget)
         daily_budget = budget / duration
-        
-        # Process recommendations
-        influencer_tips = []
-        if influencer_recs:
-            for rec in influencer_recs[:5]:  # Limit to top 5
-                influencer_tips.append(f"- {rec['place']}: {rec['tip']} (Budget: {rec['budget_range']}, Best time: {rec['best_time']})")
-        
-        youtube_insights = []
-        if youtube_content:
-            for video in youtube_content[:3]:  # Limit to top 3
-                if video.get('locations'):
-                    for location in video['locations'][:2]:
-                        youtube_insights.append(f"- {location} (Featured in: {video['title']})")
-        
-        prompt = f"""
-        Create a detailed {duration}-day {style} travel itinerary for {destination}.
-        
-        REQUIREMENTS:
-        - Total Budget: ₹{budget} (₹{daily_budget:.0f} per day)
-        - Style: {style.title()} (adjust luxury level accordingly)
-        - Themes: {theme_str}
-        
-        LOCAL EXPERT RECOMMENDATIONS:
-        {chr(10).join(influencer_tips) if influencer_tips else "No local recommendations available"}
-        
-        POPULAR ATTRACTIONS (from travel vlogs):
-        {chr(10).join(youtube_insights) if youtube_insights else "No video recommendations available"}
-        
-        FORMAT EXACTLY LIKE THIS:
-        
-        Day 1:
-        9:00 AM: Visit Anjuna Beach - Enjoy sunrise and morning walk (₹200, 3 hours)
-        Location: Anjuna Beach, North Goa
-        Details: Beautiful sunrise views, morning yoga, beach cafes for breakfast
-        
-        1:00 PM: Explore Fort Aguada - Historical Portuguese fort tour (₹300, 2 hours)  
-        Location: Fort Aguada, Candolim
-        Details: 17th-century fort, lighthouse, panoramic sea views
-        
-        6:00 PM: Sunset at Baga Beach - Beach activities and dinner (₹800, 4 hours)
-        Location: Baga Beach, North Goa
-        Details: Water sports, beach shacks, famous nightlife area
-        
-        Day 2:
-        [Continue same format for all {duration} days]
-        
-        COST GUIDELINES ({style}):
-        - Economical: Activities ₹100-500, Food ₹200-400, Hotels ₹1000-2000
-        - Balanced: Activities ₹300-800, Food ₹400-800, Hotels ₹2000-4000  
-        - Luxury: Activities ₹500-1500, Food ₹800-2000, Hotels ₹4000-8000
-        
-        Include specific place names, exact costs in ₹, and detailed descriptions for each activity.
-        """
-        
-        return prompt
+
+        return _ENHANCED_PROMPT_TEMPLATE.format(
+            duration=duration,
+            style=style,
+            style_title=style.title(),
+            destination=destination,
+            budget=budget,
+            daily_budget=daily_budget,
+            theme_str=theme_str,
+            tips_block=tips_block,
+            videos_block=videos_block
+        )
     
-    def _generate_with_gemini(self, prompt):
-        """Generate content using Gemini with rate limiting"""
+    def _generate_with_gemini(self, prompt, config=None, model_override=None, max_tokens=2048, temperature=0.8):
+        """Generate content using Gemini, serving repeated prompts from cache"""
+        model = model_override or self.model_name
+        # cached_content is part of the effective input: the same prompt
+        # against different cached contexts must not share an entry. The
+        # plain key shape is kept when no context cache is in play so
+        # the streaming path's entries stay shareable.
+        cached_content = getattr(config, 'cached_content', None) if config else None
+        key_text = f"{model}\x00{prompt}" if not cached_content else f"{model}\x00{cached_content}\x00{prompt}"
+        cache_key = hashlib.blake2b(key_text.encode('utf-8'), digest_size=16).hexdigest()
+        now = time.monotonic()
+        cls = AIServiceEnhanced
+
+        with cls._response_cache_lock:
+            entry = cls._response_cache.get(cache_key)
+            if entry and now - entry[1] < cls._RESPONSE_CACHE_TTL:
+                print("⚡ Response cache hit - skipping Gemini call")
+                return entry[0]
+
+        response_text = self._generate_with_gemini_uncached(
+            prompt, config=config, model_override=model_override,
+            max_tokens=max_tokens, temperature=temperature
+        )
+
+        if response_text:
+            with cls._response_cache_lock:
+                if len(cls._response_cache) >= cls._RESPONSE_CACHE_MAX:
+                    oldest = min(cls._response_cache, key=lambda k: cls._response_cache[k][1])
+                    del cls._response_cache[oldest]
+                cls._response_cache[cache_key] = (response_text, now)
+
+        return response_text
+
+    def _generate_and_parse_stream(self, prompt, duration, influencer_recs, youtube_content):
+        """Stream a Gemini response, parsing each Day block as soon as it completes.
+
+        Parse CPU overlaps decode time instead of waiting for the full
+        2048-token response. Returns (response_text, daily_plans);
+        daily_plans is None on a cache hit (the cached text goes through
+        the buffered parser) and (None, None) if streaming failed so the
+        caller can fall back to _generate_with_gemini.
+        """
+        # Same model-prefixed key as _generate_with_gemini so the two
+        # paths share entries and a model re-resolution can't serve
+        # another model's response
+        cache_key = hashlib.blake2b(f"{self.model_name}\x00{prompt}".encode('utf-8'), digest_size=16).hexdigest()
+        now = time.monotonic()
+        cls = AIServiceEnhanced
+
+        with cls._response_cache_lock:
+            entry = cls._response_cache.get(cache_key)
+            if entry and now - entry[1] < cls._RESPONSE_CACHE_TTL:
+                print("⚡ Response cache hit - skipping Gemini call")
+                return entry[0], None
+
+        daily_plans = []
+
+        def _parse_block(block):
+            header = _DAY_BOUNDARY.match(block)
+            day_num = int(header.group(1))
+            if day_num > duration:
+                return
+            activities = self._extract_activities_from_text(
+                block[header.end():], influencer_recs, youtube_content
+            )
+            if activities:
+                daily_plans.append({'day': day_num, 'activities': activities})
+
+        def _drain_completed(pending):
+            boundaries = list(_DAY_BOUNDARY.finditer(pending))
+            while len(boundaries) >= 2:
+                _parse_block(pending[boundaries[0].start():boundaries[1].start()])
+                pending = pending[boundaries[1].start():]
+                boundaries = list(_DAY_BOUNDARY.finditer(pending))
+            return pending
+
+        chunks = []
+        pending = ''
         try:
-            import time
-            time.sleep(1)  # Rate limiting
-        
-            response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=GenerateContentConfig(
+            _VERTEX_LIMITER.acquire()
+            with _GEMINI_CONCURRENCY:
+                stream = self.client.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=GenerateContentConfig(
+                        candidate_count=1,
+                        max_output_tokens=2048,
+                        temperature=0.8,
+                        top_p=0.9
+                    )
+                )
+                for chunk in stream:
+                    chunk_text = getattr(chunk, 'text', None)
+                    if not chunk_text:
+                        continue
+                    chunks.append(chunk_text)
+                    pending = _drain_completed(pending + chunk_text)
+        except Exception as e:
+            print(f"Gemini streaming error: {str(e)}")
+            return None, None
+
+        # The last day has no following boundary; parse the trailing block
+        trailing = _DAY_BOUNDARY.search(pending)
+        if trailing:
+            _parse_block(pending[trailing.start():])
+
+        response_text = ''.join(chunks)
+        if response_text:
+            with cls._response_cache_lock:
+                if len(cls._response_cache) >= cls._RESPONSE_CACHE_MAX:
+                    oldest = min(cls._response_cache, key=lambda k: cls._response_cache[k][1])
+                    del cls._response_cache[oldest]
+                cls._response_cache[cache_key] = (response_text, time.monotonic())
+
+        return response_text, daily_plans
+
+    def _generate_with_gemini_uncached(self, prompt, config=None, model_override=None, max_tokens=2048, temperature=0.8):
+        """Generate content using Gemini with rate limiting"""
+        if config is None:
+            config = GenerateContentConfig(
                 candidate_count=1,
-                max_output_tokens=2048,
-                temperature=0.8,
+                max_output_tokens=max_tokens,
+                temperature=temperature,
                 top_p=0.9
             )
-        )
-        
-            print(f"🔍 Response type: {type(response)}")
-            print(f"🔍 Response attributes: {dir(response)}")
-        
-        # Handle different response structures from Google GenAI
-            if response:
-            # Method 1: Direct text attribute
-                if hasattr(response, 'text') and response.text:
-                    print(f"✅ Found text via direct attribute: {len(response.text)} chars")
-                    return response.text
-            
-            # Method 2: Candidates structure
-                if hasattr(response, 'candidates') and response.candidates:
-                    print(f"🔍 Found {len(response.candidates)} candidates")
-                    candidate = response.candidates[0]
-                    print(f"🔍 Candidate type: {type(candidate)}")
-                    print(f"🔍 Candidate attributes: {dir(candidate)}")
-                
-                    if hasattr(candidate, 'content') and candidate.content:
-                        content = candidate.content
-                        print(f"🔍 Content type: {type(content)}")
-                        print(f"🔍 Content attributes: {dir(content)}")
-                    
-                    # Try parts structure
-                        if hasattr(content, 'parts') and content.parts:
-                            print(f"🔍 Found {len(content.parts)} parts")
-                            response_text = ""
-                            for i, part in enumerate(content.parts):
-                                print(f"🔍 Part {i} type: {type(part)}")
-                                print(f"🔍 Part {i} attributes: {dir(part)}")
-                                if hasattr(part, 'text') and part.text:
-                                    response_text += part.text
-                                    print(f"✅ Added text from part {i}: {len(part.text)} chars")
-                            if response_text:
-                                return response_text
-                    
-                    # Try direct content text
-                        if hasattr(content, 'text') and content.text:
-                            print(f"✅ Found text via content.text: {len(content.text)} chars")
-                            return content.text
-                
-                # Try direct candidate text
-                    if hasattr(candidate, 'text') and candidate.text:
-                        print(f"✅ Found text via candidate.text: {len(candidate.text)} chars")
-                        return candidate.text
-            
-            # Method 3: String response
-                if isinstance(response, str):
-                    print(f"✅ Response is string: {len(response)} chars")
-                    return response
-            
-            # Method 4: Dictionary response
-                if isinstance(response, dict):
-                    print(f"🔍 Response is dict with keys: {response.keys()}")
-                    if 'text' in response and response['text']:
-                        return response['text']
-                    if 'candidates' in response and response['candidates']:
-                        candidate = response['candidates'][0]
-                        if 'content' in candidate:
-                            content = candidate['content']
-                            if 'parts' in content:
-                                text_parts = []
-                                for part in content['parts']:
-                                    if 'text' in part and part['text']:
-                                        text_parts.append(part['text'])
-                                if text_parts:
-                                    return ''.join(text_parts)
-                            if 'text' in content and content['text']:
-                                return content['text']
-        
+        try:
+            attempts = 0
+            while True:
+                _VERTEX_LIMITER.acquire()
+                try:
+                    with _GEMINI_CONCURRENCY:
+                        response = self.client.models.generate_content(
+                            model=model_override or self.model_name,
+                            contents=prompt,
+                            config=config
+                        )
+                    break
+                except Exception as e:
+                    attempts += 1
+                    quota_hit = '429' in str(e) or 'RESOURCE_EXHAUSTED' in str(e)
+                    if not quota_hit or attempts >= 4:
+                        raise
+                    backoff = 2 ** attempts
+                    print(f"⏳ Vertex quota hit, retrying in {backoff}s")
+                    time.sleep(backoff)
+
+            # Walk the response with getattr defaults instead of the old
+            # hasattr + dir() ladder: dir() built sorted attribute lists on
+            # every call purely for debug output, and each hasattr is a
+            # hidden try/except. Same fallback order as before.
+            if response is None:
+                print(f"❌ Could not extract text from response structure")
+                return None
+
+            text = getattr(response, 'text', None)
+            if text:
+                return text
+
+            candidates = getattr(response, 'candidates', None)
+            if candidates:
+                candidate = candidates[0]
+                content = getattr(candidate, 'content', None)
+                if content is not None:
+                    parts = getattr(content, 'parts', None)
+                    if parts:
+                        text = ''.join(part.text for part in parts if getattr(part, 'text', None))
+                        if text:
+                            return text
+                    text = getattr(content, 'text', None)
+                    if text:
+                        return text
+                text = getattr(candidate, 'text', None)
+                if text:
+                    return text
+
+            if isinstance(response, str):
+                return response
+
+            if isinstance(response, dict):
+                if response.get('text'):
+                    return response['text']
+                dict_candidates = response.get('candidates')
+                if dict_candidates:
+                    content = dict_candidates[0].get('content', {})
+                    text = ''.join(p['text'] for p in content.get('parts', []) if p.get('text'))
+                    if text:
+                        return text
+                    if content.get('text'):
+                        return content['text']
+
             print(f"❌ Could not extract text from response structure")
             return None
         
@@ -866,28 +1151,32 @@ class AIServiceEnhanced:
             print(f"🔍 Full traceback: {traceback.format_exc()}")
             return None
     
-    def _parse_gemini_response(self, response_text, destination, duration, budget, budget_type, influencer_recs, youtube_content):
+    def _parse_gemini_response(self, response_text, destination, duration, budget, budget_type, influencer_recs, youtube_content, daily_plans=None):
         """Parse Gemini response into structured itinerary"""
         try:
             print(f"    🔍 Parsing response for {budget_type}: {len(response_text)} chars")
-            
-            # Extract daily activities using regex patterns
-            daily_plans = []
-            
-            # Try multiple parsing approaches
-            # Approach 1: Look for "Day X" patterns
-            day_pattern = r'Day\s*(\d+)[:.]?\s*(.*?)(?=Day\s*\d+|$)'
-            day_matches = re.findall(day_pattern, response_text, re.DOTALL | re.IGNORECASE)
-            
-            print(f"    📋 Found {len(day_matches)} day matches using Day pattern")
-            
-            if day_matches:
+
+            if daily_plans:
+                # Day blocks were already parsed while the response streamed
+                print(f"    ⚡ Reusing {len(daily_plans)} day blocks parsed during streaming")
+            else:
+                # Extract daily activities using regex patterns
+                daily_plans = []
+
+                # Try multiple parsing approaches
+                # Approach 1: Split on "Day X" headers — a single linear
+                # pass; split() alternates captured numbers and contents
+                parts = _DAY_SPLIT.split(response_text)
+                day_matches = list(zip(parts[1::2], parts[2::2]))
+
+                print(f"    📋 Found {len(day_matches)} day matches using Day pattern")
+
                 for day_num, day_content in day_matches:
                     if int(day_num) > duration:
                         break
-                        
+
                     activities = self._extract_activities_from_text(day_content, influencer_recs, youtube_content)
-                    
+
                     if activities:
                         daily_plans.append({
                             'day': int(day_num),
@@ -903,16 +1192,13 @@ class AIServiceEnhanced:
                 daily_plans = self._create_enhanced_fallback_plans(
                     destination, duration, budget, budget_type
                 )
-            
-            # Approach 3: If still no plans, use enhanced fallback
-            if not daily_plans:
-                print(f"    🔄 Using enhanced fallback for {destination}")
-                daily_plans = self._create_enhanced_fallback_plans(destination, duration, budget, budget_type)
-            
-            # Calculate total cost
+
+            # Calculate total cost — one flat generator instead of a sum
+            # of per-day sums, halving the generator-protocol overhead
             total_cost = sum(
-                sum(activity.get('cost', 0) for activity in day['activities'])
+                activity.get('cost', 0)
                 for day in daily_plans
+                for activity in day['activities']
             )
             
             result = {
@@ -942,62 +1228,79 @@ class AIServiceEnhanced:
     def _extract_activities_from_text(self, day_content, influencer_recs, youtube_content):
         """Extract structured activities from day content text"""
         activities = []
-        
-        # Common time patterns
-        time_patterns = [
-            r'(\d{1,2}:\d{2}\s*(?:AM|PM))',
-            r'(\d{1,2}\s*(?:AM|PM))',
-            r'(Morning|Afternoon|Evening|Night)',
-            r'(\d{1,2}-\d{1,2}\s*(?:AM|PM))',
-        ]
-        
-        # Extract activities with time, cost, and description
-        lines = day_content.split('\n')
-        current_activity = {}
-        
-        for line in lines:
-            line = line.strip()
-            if not line or len(line) < 3:
+
+        def _close_activity(activity):
+            # Continuation lines are collected in a list and joined once
+            # here instead of repeated string concatenation
+            activity['details'] = ' '.join(activity.pop('details_parts'))
+            activities.append(activity)
+
+        # Lowered match tables built once per day block; each header then
+        # needs a single pass through _match_activity
+        match_index = self._build_match_index(influencer_recs, youtube_content)
+
+        # One finditer over the whole block anchored on time tokens; the
+        # text between consecutive anchors belongs to one activity. This
+        # replaces the line-by-line loop that re-ran the time scan per line.
+        # A single line can carry several time-like tokens ("9:00 AM:
+        # sunrise walk, back by 11 AM"); only the first anchor on each
+        # line opens an activity, later ones are details of it.
+        time_matches = []
+        last_line_start = -1
+        for time_match in _TIME_UNION.finditer(day_content):
+            # Rewind to the start of the line the anchor sits on so the
+            # header keeps any leading text before the time token
+            line_start = day_content.rfind('\n', 0, time_match.start()) + 1
+            if line_start == last_line_start:
                 continue
-            
-            # Check for time indicators
-            time_found = False
-            for pattern in time_patterns:
-                time_match = re.search(pattern, line, re.IGNORECASE)
-                if time_match:
-                    # Save previous activity
-                    if current_activity and current_activity.get('activity'):
-                        activities.append(current_activity)
-                    
-                    # Start new activity
-                    current_activity = {
-                        'time': time_match.group(1),
-                        'activity': line.replace(time_match.group(1), '').strip(' :-'),
-                        'duration': self._extract_duration(line),
-                        'cost': self._extract_cost(line),
-                        'place': self._extract_place(line),
-                        'details': line,
-                        'influencer_recommended': self._check_influencer_match(line, influencer_recs),
-                        'youtube_recommended': self._check_youtube_match(line, youtube_content)
-                    }
-                    time_found = True
-                    break
-            
-            if not time_found and current_activity:
-                # Add to current activity details
-                current_activity['details'] += ' ' + line
-                # Update place and cost if found in additional lines
+            time_matches.append((time_match, line_start))
+            last_line_start = line_start
+
+        for index, (time_match, line_start) in enumerate(time_matches):
+            end = time_matches[index + 1][1] if index + 1 < len(time_matches) else len(day_content)
+            # splitlines() runs in C and handles \r\n from the API cleanly
+            segment_lines = [ln.strip() for ln in day_content[line_start:end].splitlines()]
+            segment_lines = [ln for ln in segment_lines if len(ln) >= 3]
+            if not segment_lines:
+                continue
+
+            header = segment_lines[0]
+            time_str = time_match.group(time_match.lastgroup)
+            fields = self._scan_line_fields(header)
+            matches = self._match_activity(header, match_index)
+
+            current_activity = {
+                'time': time_str,
+                'activity': header.replace(time_str, '').strip(' :-'),
+                'duration': fields.get('duration', '2-3 hours'),
+                'cost': fields.get('cost', 500),
+                'place': fields.get('place', ''),
+                'details_parts': [header],
+                'influencer_recommended': matches['influencer'] is not None,
+                'youtube_recommended': matches['youtube'] is not None
+            }
+            # Carry the matched source through so the UI can show the tip
+            # and link the video, like the fallback parser does
+            if matches['influencer'] is not None:
+                current_activity['tip'] = matches['influencer'].get('recommendation', '')
+            if matches['youtube'] is not None:
+                current_activity['video_title'] = matches['youtube'].get('title', 'Travel Video')
+                current_activity['video_id'] = matches['youtube'].get('video_id')
+
+            for line in segment_lines[1:]:
+                # Continuation lines: collect details, fill place and cost
+                # if the header didn't carry them
+                current_activity['details_parts'].append(line)
+                fields = self._scan_line_fields(line)
                 if not current_activity.get('place'):
-                    current_activity['place'] = self._extract_place(line)
-                if current_activity.get('cost', 0) == 0:
-                    new_cost = self._extract_cost(line)
-                    if new_cost > 0:
-                        current_activity['cost'] = new_cost
-        
-        # Add last activity
-        if current_activity and current_activity.get('activity'):
-            activities.append(current_activity)
-        
+                    current_activity['place'] = fields.get('place', '')
+                if current_activity.get('cost', 0) == 0 and fields.get('cost', 0) > 0:
+                    current_activity['cost'] = fields['cost']
+
+            if current_activity.get('activity'):
+                _close_activity(current_activity)
+
+
         # Ensure we have at least basic activities
         if not activities:
             activities = self._create_basic_activities(day_content)
@@ -1006,90 +1309,41 @@ class AIServiceEnhanced:
         cleaned_activities = []
         for activity in activities:
             if activity.get('activity') and len(activity['activity'].strip()) > 0:
-                # Ensure all required fields exist with safe defaults
-                cleaned_activity = {
-                    'time': activity.get('time', '9:00 AM'),
-                    'activity': activity.get('activity', 'Local Activity'),
-                    'duration': activity.get('duration', '2-3 hours'),
-                    'cost': int(activity.get('cost', 500)) if activity.get('cost') else 500,
-                    'place': activity.get('place', 'Local area'),
-                    'details': activity.get('details', activity.get('activity', 'Explore local attractions and experiences')),
-                    'influencer_recommended': activity.get('influencer_recommended', False),
-                    'youtube_recommended': activity.get('youtube_recommended', False),
-                    'hotel_recommendation': activity.get('hotel_recommendation', False),
-                    'transport_recommendation': activity.get('transport_recommendation', False),
-                    'flight_recommendation': activity.get('flight_recommendation', False)
-                }
-                
-                # Add optional fields if they exist
-                if activity.get('tip'):
-                    cleaned_activity['tip'] = activity['tip']
-                if activity.get('video_title'):
-                    cleaned_activity['video_title'] = activity['video_title']
-                if activity.get('video_id'):
-                    cleaned_activity['video_id'] = activity['video_id']
-                
+                # One C-level merge over the defaults instead of a .get()
+                # per field; optional keys (tip, video_title, video_id)
+                # carry through untouched
+                cleaned_activity = {**_ACTIVITY_DEFAULTS, **activity}
+                cleaned_activity['cost'] = int(cleaned_activity['cost']) if cleaned_activity['cost'] else 500
+                if cleaned_activity['details'] is None:
+                    cleaned_activity['details'] = activity.get('activity', 'Explore local attractions and experiences')
+
                 cleaned_activities.append(cleaned_activity)
         
         return cleaned_activities if cleaned_activities else self._create_basic_activities(day_content)
     
-    def _extract_cost(self, text):
-        """Extract cost from text"""
-        cost_patterns = [
-            r'₹(\d+(?:,\d+)*)',
-            r'INR\s*(\d+(?:,\d+)*)',
-            r'Rs\.?\s*(\d+(?:,\d+)*)',
-            r'(\d+(?:,\d+)*)\s*rupees'
-        ]
-        
-        for pattern in cost_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                cost_str = match.group(1).replace(',', '')
-                return int(cost_str)
-        
-        return random.randint(200, 2000)  # Default random cost
-    
-    def _extract_duration(self, text):
-        """Extract duration from text"""
-        duration_patterns = [
-            r'(\d+)\s*hours?',
-            r'(\d+)\s*hrs?',
-            r'(\d+)\s*minutes?',
-            r'(\d+)\s*mins?'
-        ]
-        
-        for pattern in duration_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                num = int(match.group(1))
-                if 'min' in text.lower():
-                    return f"{num} minutes"
-                else:
-                    return f"{num} hours"
-        
-        return "2-3 hours"  # Default duration
-    
-    def _extract_place(self, text):
-        """Extract place/location from text"""
-        # Common location indicators
-        location_patterns = [
-            r'at\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'in\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'visit\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'explore\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\|)',
-            r'([A-Z][a-zA-Z\s]+?)\s+(?:Beach|Fort|Temple|Market|Palace|Garden|Museum)',
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                place = match.group(1).strip()
-                if len(place) > 2 and len(place) < 50:  # Reasonable place name length
-                    return place
-        
-        return ""  # Return empty string if no place found
-    
+    @staticmethod
+    def _scan_line_fields(line):
+        """Pull cost, duration and place out of a line in one regex pass
+
+        Dispatches on the named group of each match; the first hit per
+        field wins, mirroring the search order of the standalone helpers.
+        """
+        fields = {}
+        for match in _LINE_FIELDS.finditer(line):
+            group = match.lastgroup
+            value = match.group(group)
+            if group.startswith('cost'):
+                fields.setdefault('cost', int(value.replace(',', '')))
+            elif group == 'dur_hours':
+                fields.setdefault('duration', f"{int(value)} hours")
+            elif group == 'dur_minutes':
+                fields.setdefault('duration', f"{int(value)} minutes")
+            else:
+                place = value.strip()
+                if 2 < len(place) < 50:
+                    fields.setdefault('place', place)
+        return fields
+
     def _create_smart_daily_plans_from_text(self, response_text, destination, duration, budget, budget_type):
         """Create daily plans from general Gemini response text"""
         daily_plans = []
@@ -1147,106 +1401,35 @@ class AIServiceEnhanced:
     
     def _extract_attractions_from_text(self, text, destination):
         """Extract attraction names from Gemini response text"""
-        attractions = []
-        
-        # Common attraction patterns
-        patterns = [
-            r'visit\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'explore\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'see\s+([A-Z][a-zA-Z\s]+?)(?:\s|,|\.|\n)',
-            r'([A-Z][a-zA-Z\s]+?)\s+(?:Fort|Palace|Temple|Museum|Market|Beach|Lake|Garden)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                attraction = match.strip()
-                if len(attraction) > 3 and len(attraction) < 30 and attraction not in attractions:
-                    attractions.append(attraction)
-        
+        # One pass over the text; dict.fromkeys dedups while keeping order
+        candidates = (
+            (m.group(1) or m.group(2)).strip()
+            for m in _ATTRACTION_UNION.finditer(text)
+        )
+        attractions = list(dict.fromkeys(c for c in candidates if 3 < len(c) < 30))
+
         # Add some default attractions if none found
         if not attractions:
-            if destination.lower() == 'hyderabad':
-                attractions = ['Charminar', 'Golconda Fort', 'Hussain Sagar Lake', 'Ramoji Film City', 'Birla Mandir', 'Salar Jung Museum']
-            elif destination.lower() == 'goa':
-                attractions = ['Baga Beach', 'Fort Aguada', 'Old Goa Churches', 'Anjuna Beach', 'Dudhsagar Falls', 'Palolem Beach']
-            else:
-                attractions = [f'{destination} City Center', f'{destination} Market', f'{destination} Heritage Sites']
-        
+            attractions = _DEFAULT_ATTRACTIONS.get(destination.lower(), [
+                f'{destination} City Center', f'{destination} Market', f'{destination} Heritage Sites'
+            ])
+
         return attractions[:9]  # Limit to 9 attractions (3 per day for 3 days)
     
     def _create_enhanced_fallback_plans(self, destination, duration, budget, budget_type):
         """Create enhanced fallback plans with destination-specific content"""
+        plans = self._build_fallback_plans(destination, duration, budget, budget_type)
+        # Deep-copy out so callers can't mutate the cached template
+        return copy.deepcopy(plans)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _build_fallback_plans(destination, duration, budget, budget_type):
+        """Build the stock fallback plans, memoized per (destination, duration, budget, type)"""
         print(f"    🏗️ Creating enhanced fallback for {destination}, {budget_type}, ₹{budget}")
         daily_budget = budget / duration
         
-        # Destination-specific templates
-        templates = {
-            'hyderabad': {
-                'attractions': ['Charminar & Laad Bazaar', 'Golconda Fort', 'Hussain Sagar Lake', 'Ramoji Film City', 'Birla Mandir', 'Salar Jung Museum'],
-                'foods': ['Hyderabadi Biryani', 'Haleem', 'Qubani ka Meetha', 'Irani Chai', 'Kebabs', 'Nihari'],
-                'areas': ['Old City', 'Banjara Hills', 'Jubilee Hills', 'Secunderabad', 'Hitech City', 'Charminar Area'],
-                'hotels': {
-                    'Budget-Friendly': [
-                        {'name': 'Hotel Sitara Grand', 'price': 1500, 'area': 'Banjara Hills', 'rating': '3-star'},
-                        {'name': 'Treebo Trend Amber', 'price': 1800, 'area': 'Gachibowli', 'rating': '3-star'}
-                    ],
-                    'Standard': [
-                        {'name': 'Novotel Hyderabad Airport', 'price': 3500, 'area': 'HITEC City', 'rating': '4-star'},
-                        {'name': 'Marriott Hyderabad', 'price': 4000, 'area': 'Tank Bund Road', 'rating': '4-star'}
-                    ],
-                    'Premium': [
-                        {'name': 'Park Hyatt Hyderabad', 'price': 8000, 'area': 'Banjara Hills', 'rating': '5-star'},
-                        {'name': 'ITC Kohenur', 'price': 7500, 'area': 'HITEC City', 'rating': '5-star'}
-                    ]
-                },
-                'transport': {
-                    'Budget-Friendly': {'mode': 'Metro/Bus', 'daily_cost': 200},
-                    'Standard': {'mode': 'Cab/Auto', 'daily_cost': 500},
-                    'Premium': {'mode': 'Private Car', 'daily_cost': 1000}
-                }
-            },
-            'goa': {
-                'attractions': ['Baga Beach', 'Fort Aguada', 'Basilica of Bom Jesus', 'Anjuna Beach', 'Dudhsagar Falls', 'Palolem Beach'],
-                'foods': ['Fish Curry Rice', 'Bebinca', 'Feni', 'Prawn Balchao', 'Goan Sausage', 'Sol Kadhi'],
-                'areas': ['North Goa', 'South Goa', 'Panaji', 'Old Goa', 'Candolim', 'Calangute'],
-                'hotels': {
-                    'Budget-Friendly': [
-                        {'name': 'OYO Beach Resort', 'price': 1800, 'area': 'Calangute', 'rating': '3-star'},
-                        {'name': 'Zostel Goa', 'price': 1500, 'area': 'Anjuna', 'rating': '3-star'}
-                    ],
-                    'Standard': [
-                        {'name': 'Lemon Tree Hotel', 'price': 4000, 'area': 'Candolim', 'rating': '4-star'},
-                        {'name': 'Novotel Goa Resort', 'price': 4500, 'area': 'Dona Paula', 'rating': '4-star'}
-                    ],
-                    'Premium': [
-                        {'name': 'Taj Exotica Resort', 'price': 12000, 'area': 'Benaulim', 'rating': '5-star'},
-                        {'name': 'Grand Hyatt Goa', 'price': 10000, 'area': 'Bambolim', 'rating': '5-star'}
-                    ]
-                },
-                'transport': {
-                    'Budget-Friendly': {'mode': 'Local Bus/Bike Rental', 'daily_cost': 300},
-                    'Standard': {'mode': 'Taxi/Scooter Rental', 'daily_cost': 600},
-                    'Premium': {'mode': 'Private Car with Driver', 'daily_cost': 1200}
-                }
-            }
-        }
-        
-        template = templates.get(destination.lower(), {
-            'attractions': [f'{destination} Main Attractions', f'{destination} Heritage Sites', f'{destination} Local Markets'],
-            'foods': ['Local Cuisine', 'Street Food', 'Traditional Dishes'],
-            'areas': [f'{destination} City Center', f'{destination} Old Town', f'{destination} Modern Area'],
-            'hotels': {
-                'Budget-Friendly': [{'name': f'Budget Hotel {destination}', 'price': 1200, 'area': f'{destination} Center', 'rating': '3-star'}],
-                'Standard': [{'name': f'Standard Hotel {destination}', 'price': 2500, 'area': f'{destination} Center', 'rating': '4-star'}],
-                'Premium': [{'name': f'Luxury Hotel {destination}', 'price': 5000, 'area': f'{destination} Center', 'rating': '5-star'}]
-            },
-            'transport': {
-                'Budget-Friendly': {'mode': 'Local Bus/Metro', 'daily_cost': 150},
-                'Standard': {'mode': 'Taxi/Auto', 'daily_cost': 400},
-                'Premium': {'mode': 'Private Car', 'daily_cost': 800}
-            }
-        })
+        template = _FALLBACK_TEMPLATES.get(destination.lower()) or _generic_fallback_template(destination)
         
         print(f"    📋 Using template for {destination.lower()}: {len(template.get('hotels', {}))} hotel categories")
         
@@ -1260,16 +1443,31 @@ class AIServiceEnhanced:
         print(f"    🏨 Selected hotel: {selected_hotel['name']} (₹{selected_hotel['price']})")
         print(f"    🚗 Selected transport: {transport['mode']} (₹{transport['daily_cost']}/day)")
         
+        # Flight cost decided up front so day 1 can be built in order,
+        # avoiding the O(N) insert(0, ...) after the loop
+        flight_cost = int(budget * 0.15) if budget_type == 'Budget-Friendly' else int(budget * 0.2)
+
         for day in range(1, duration + 1):
             activities = []
-            
+
             # Get attractions for this day
             day_attractions = template['attractions'][(day-1)*2:(day-1)*2+3]
             day_foods = template['foods'][(day-1)*2:(day-1)*2+2] if 'foods' in template else ['Local Cuisine']
-            
-            # Transportation (start of day)
+
+            # Arrival flight, then transportation (start of day 1)
             if day == 1:
                 activities.append({
+                    **_EMPTY_FLAGS,
+                    'time': '6:00 AM',
+                    'activity': f'Flight to {destination}',
+                    'duration': '2-3 hours',
+                    'cost': flight_cost,
+                    'place': f'{destination} Airport',
+                    'details': f'{budget_type} flight booking to {destination}. Includes airport transfers and comfortable seating.',
+                    'flight_recommendation': True
+                })
+                activities.append({
+                    **_EMPTY_FLAGS,
                     'time': '8:00 AM',
                     'activity': f'Transportation - {transport["mode"]}',
                     'duration': '1 hour',
@@ -1282,54 +1480,43 @@ class AIServiceEnhanced:
             # Morning
             morning_attraction = day_attractions[0] if day_attractions else f'{destination} Sightseeing'
             morning_activity = {
+                **_EMPTY_FLAGS,
                 'time': '9:00 AM',
                 'activity': f'Visit {morning_attraction}',
                 'duration': '3 hours',
                 'cost': int(daily_budget * 0.2),
                 'place': morning_attraction,
-                'details': f'Explore the historic and cultural significance of {morning_attraction}. Perfect for morning photography and learning about local heritage.',
-                'influencer_recommended': False,
-                'youtube_recommended': False,
-                'hotel_recommendation': False,
-                'transport_recommendation': False,
-                'flight_recommendation': False
+                'details': f'Explore the historic and cultural significance of {morning_attraction}. Perfect for morning photography and learning about local heritage.'
             }
             activities.append(morning_activity)
             
             # Afternoon
             afternoon_attraction = day_attractions[1] if len(day_attractions) > 1 else f'{destination} Local Experience'
             activities.append({
+                **_EMPTY_FLAGS,
                 'time': '1:00 PM',
                 'activity': f'Explore {afternoon_attraction}',
                 'duration': '4 hours',
                 'cost': int(daily_budget * 0.25),
                 'place': afternoon_attraction,
-                'details': f'Afternoon exploration of {afternoon_attraction} including local shopping and cultural experiences.',
-                'influencer_recommended': False,
-                'youtube_recommended': False,
-                'hotel_recommendation': False,
-                'transport_recommendation': False,
-                'flight_recommendation': False
+                'details': f'Afternoon exploration of {afternoon_attraction} including local shopping and cultural experiences.'
             })
             
             # Evening
             evening_food = day_foods[0] if day_foods else 'Local Cuisine'
             activities.append({
+                **_EMPTY_FLAGS,
                 'time': '6:00 PM',
                 'activity': f'Dinner & {evening_food} Experience',
                 'duration': '3 hours',
                 'cost': int(daily_budget * 0.2),
                 'place': f'{destination} Restaurant District',
-                'details': f'Enjoy authentic {evening_food} at local restaurants with evening entertainment and cultural shows.',
-                'influencer_recommended': False,
-                'youtube_recommended': False,
-                'hotel_recommendation': False,
-                'transport_recommendation': False,
-                'flight_recommendation': False
+                'details': f'Enjoy authentic {evening_food} at local restaurants with evening entertainment and cultural shows.'
             })
             
             # Night accommodation
             activities.append({
+                **_EMPTY_FLAGS,
                 'time': '10:00 PM',
                 'activity': f'Stay at {selected_hotel["name"]}',
                 'duration': '10 hours',
@@ -1344,24 +1531,56 @@ class AIServiceEnhanced:
                 'activities': activities
             })
         
-        # Add flight recommendations for the itinerary
-        flight_cost = int(budget * 0.15) if budget_type == 'Budget-Friendly' else int(budget * 0.2)
-        daily_plans[0]['activities'].insert(0, {
-            'time': '6:00 AM',
-            'activity': f'Flight to {destination}',
-            'duration': '2-3 hours',
-            'cost': flight_cost,
-            'place': f'{destination} Airport',
-            'details': f'{budget_type} flight booking to {destination}. Includes airport transfers and comfortable seating.',
-            'flight_recommendation': True
-        })
-        
         print(f"    ✈️ Added flight: ₹{flight_cost}")
         print(f"    📊 Total activities per day: {[len(day['activities']) for day in daily_plans]}")
         
         return daily_plans
     
+    def _cached_destination_fetch(self, kind, destination, fetch):
+        """Serve a destination-keyed fetch from the shared TTL cache"""
+        key = (kind, destination.lower().strip())
+        now = time.monotonic()
+        cls = AIServiceEnhanced
+
+        with cls._dest_cache_lock:
+            entry = cls._dest_cache.get(key)
+            if entry and now - entry[1] < cls._DEST_CACHE_TTL:
+                return copy.deepcopy(entry[0])
+            if now < cls._dest_fail_until.get(key, 0.0):
+                # Breaker open after a recent failure: don't re-probe the
+                # backend yet; an expired entry is better than nothing
+                return copy.deepcopy(entry[0]) if entry else []
+
+        try:
+            value = fetch(destination)
+        except Exception as fetch_error:
+            print(f"Error fetching {kind} for {destination}: {str(fetch_error)}")
+            value = None
+
+        if not value:
+            # The fetchers return [] on error, so an empty value means a
+            # failure (or a destination with no data either way) — open
+            # the breaker and keep any stale entry around for next time
+            with cls._dest_cache_lock:
+                cls._dest_fail_until[key] = now + cls._DEST_FAIL_TTL
+            return copy.deepcopy(entry[0]) if entry else []
+
+        with cls._dest_cache_lock:
+            cls._dest_fail_until.pop(key, None)
+            if len(cls._dest_cache) >= cls._DEST_CACHE_MAX:
+                oldest = min(cls._dest_cache, key=lambda k: cls._dest_cache[k][1])
+                del cls._dest_cache[oldest]
+            cls._dest_cache[key] = (copy.deepcopy(value), now)
+
+        return value
+
     def _get_influencer_recommendations(self, destination):
+        """Get influencer recommendations, cached per destination"""
+        return self._cached_destination_fetch(
+            'recs', destination, self._fetch_influencer_recommendations
+        )
+
+    def _fetch_influencer_recommendations(self, destination):
         """Get influencer recommendations from BigQuery"""
         if not self.bq_client:
             return []
@@ -1369,84 +1588,127 @@ class AIServiceEnhanced:
         query = f"""
         SELECT platform, influencer_name, place_name, recommendation, category, budget_range, best_time
         FROM `{self.project_id}.travel_data.influencer_recommendations`
-        WHERE LOWER(destination) = LOWER(@destination)
+        WHERE LOWER(destination) = @destination_lower
         LIMIT 10
         """
-        
+
+        # Lower the parameter client-side so BigQuery folds the constant
+        # once instead of per-row on the parameter
         job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("destination", "STRING", destination)]
+            query_parameters=[bigquery.ScalarQueryParameter("destination_lower", "STRING", destination.lower())]
         )
         
         try:
             results = self.bq_client.query(query, job_config=job_config).result()
-            return [dict(row) for row in results]
+            # Platforms often recommend the same spot; keep one rec per
+            # place so every downstream matching loop scans fewer entries,
+            # and rank by quality so short-circuit matches take the best
+            deduped = {}
+            for row in results:
+                rec = dict(row)
+                key = rec['place_name'].lower()
+                current = deduped.get(key)
+                if current is None or self._rec_quality(rec) > self._rec_quality(current):
+                    deduped[key] = rec
+            return sorted(deduped.values(), key=self._rec_quality, reverse=True)
         except Exception as e:
             print(f"Error fetching influencer data: {str(e)}")
             return []
+
+    @staticmethod
+    def _rec_quality(rec):
+        """Crude ranking signal for competing recs about the same place"""
+        return (rec.get('best_time') is not None, len(rec.get('recommendation') or ''))
     
     def _get_youtube_content(self, destination):
+        """Get YouTube travel content, cached per destination"""
+        return self._cached_destination_fetch(
+            'youtube', destination, self._fetch_youtube_content
+        )
+
+    def _fetch_youtube_content(self, destination):
         """Get YouTube travel content"""
         try:
-            youtube_service = YouTubeService()
-            return youtube_service.get_travel_content(destination)
+            return self.youtube_service.get_travel_content(destination)
         except Exception as e:
             print(f"Error getting YouTube content: {str(e)}")
             return []
     
-    def _check_influencer_match(self, activity_text, influencer_recs):
-        """Check if activity matches influencer recommendations"""
-        for rec in influencer_recs:
-            if rec['place_name'].lower() in activity_text.lower():
-                return True
-        return False
-    
-    def _check_youtube_match(self, activity, youtube_content):
-        """Check if activity matches YouTube content"""
-        if not youtube_content:
-            return False
-        
-        activity_lower = activity.lower()
-        for video in youtube_content:
-            if any(location.lower() in activity_lower for location in video.get('locations', [])):
-                return True
-        return False
-    
-    def _get_youtube_title(self, activity, youtube_content):
-        """Get YouTube video title for matching activity"""
-        if not youtube_content:
-            return "Travel Video"
-        
-        activity_lower = activity.lower()
-        for video in youtube_content:
-            if any(location.lower() in activity_lower for location in video.get('locations', [])):
-                return video.get('title', 'Travel Video')
-        return "Travel Video"
-    
-    def _get_youtube_video_id(self, activity, youtube_content):
-        """Get YouTube video ID for matching activity"""
-        if not youtube_content:
-            return None
-        
-        activity_lower = activity.lower()
-        for video in youtube_content:
-            if any(location.lower() in activity_lower for location in video.get('locations', [])):
-                return video.get('video_id')
-        return None
-    
+    @staticmethod
+    def _build_match_index(influencer_recs, youtube_content):
+        """Build prelowered lookup tables for one itinerary
+
+        Lowercasing every place name and video location happens here, once,
+        instead of inside the per-activity matching loops. Single-word
+        terms additionally go into exact-token dicts so the common case —
+        the activity text contains the literal place name — resolves with
+        a hash lookup instead of a substring scan.
+        """
+        infl_index = tuple(
+            (rec['place_name'].lower(), rec) for rec in influencer_recs or ()
+        )
+        yt_index = tuple(
+            (location.lower(), video)
+            for video in youtube_content or ()
+            for location in video.get('locations', [])
+        )
+
+        def _exact(ordered):
+            exact = {}
+            for term, source in ordered:
+                if ' ' not in term:
+                    exact.setdefault(term, source)
+            return exact
+
+        return {
+            'infl': infl_index,
+            'yt': yt_index,
+            'infl_exact': _exact(infl_index),
+            'yt_exact': _exact(yt_index),
+        }
+
+    @staticmethod
+    def _match_activity(activity_text, match_index):
+        """Match one activity against both sources in a single lowered pass
+
+        Returns {'influencer': rec_or_None, 'youtube': video_or_None}.
+        Exact-token hits resolve in O(1); otherwise an ordered substring
+        scan preserves the old helpers' first-match semantics.
+        """
+        activity_lower = activity_text.lower()
+        tokens = {token.strip('.,()!:;-') for token in activity_lower.split()}
+
+        def _find(exact, ordered):
+            for token in tokens:
+                hit = exact.get(token)
+                if hit is not None:
+                    return hit
+            return next((source for term, source in ordered if term in activity_lower), None)
+
+        return {
+            'influencer': _find(match_index['infl_exact'], match_index['infl']),
+            'youtube': _find(match_index['yt_exact'], match_index['yt']),
+        }
+
     def _select_best_option(self, options, target_budget):
         """Select best itinerary option based on budget"""
         if not options:
             return None
-        
-        # Prefer options within budget
-        within_budget = [opt for opt in options if opt.get('total_cost', 0) <= target_budget * 1.1]
-        
-        if within_budget:
-            # Return the one closest to target budget
-            return min(within_budget, key=lambda x: abs(x.get('total_cost', 0) - target_budget))
-        else:
-            # Return cheapest option if all exceed budget
-            return min(options, key=lambda x: x.get('total_cost', float('inf')))
+
+        # Single pass: costs are pulled out once, then reused for both the
+        # within-budget preference and the cheapest-overall fallback
+        costs = [opt.get('total_cost', 0) for opt in options]
+        cap = target_budget * 1.1
+
+        best = min(
+            (pair for pair in zip(costs, options) if pair[0] <= cap),
+            key=lambda pair: abs(pair[0] - target_budget),
+            default=None,
+        )
+        if best is None:
+            # All options exceed budget; take the cheapest
+            best = min(zip(costs, options), key=lambda pair: pair[0])
+        return best[1]
     
     def _create_fallback_options(self, destination, duration, budget, themes, influencer_recs, youtube_content):
         """Create fallback options when AI generation fails"""
@@ -1501,7 +1763,7 @@ class AIServiceEnhanced:
                 'activities': activities
             })
         
-        total_cost = sum(sum(activity['cost'] for activity in day['activities']) for day in daily_plans)
+        total_cost = sum(activity['cost'] for day in daily_plans for activity in day['activities'])
         
         return {
             'destination': destination,
@@ -1535,14 +1797,20 @@ class AIServiceEnhanced:
     
     def _itinerary_to_text(self, itinerary):
         """Convert itinerary to text format for modification prompts"""
-        text = f"Destination: {itinerary['destination']}\n"
-        text += f"Duration: {itinerary['duration']} days\n"
-        text += f"Budget: ₹{itinerary['budget']}\n\n"
-        
+        # Collected in a list and joined once; += in the nested loop
+        # re-copied the accumulated text on every activity
+        parts = [
+            f"Destination: {itinerary['destination']}\n",
+            f"Duration: {itinerary['duration']} days\n",
+            f"Budget: ₹{itinerary['budget']}\n\n",
+        ]
+
         for day_plan in itinerary['daily_plans']:
-            text += f"Day {day_plan['day']}:\n"
-            for activity in day_plan['activities']:
-                text += f"  {activity['time']}: {activity['activity']} (₹{activity.get('cost', 0)})\n"
-            text += "\n"
-        
-        return text
+            parts.append(f"Day {day_plan['day']}:\n")
+            parts.extend(
+                f"  {activity['time']}: {activity['activity']} (₹{activity.get('cost', 0)})\n"
+                for activity in day_plan['activities']
+            )
+            parts.append("\n")
+
+        return ''.join(parts)
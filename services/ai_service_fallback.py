@@ -4,12 +4,74 @@ from vertexai.language_models import TextGenerationModel, ChatModel
 from google.cloud import bigquery
 import json
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from services.youtube_service import YouTubeService
 
+# Parser patterns compiled once at import. One MULTILINE pass pulls the
+# activity lines out of a day block, and one fused alternation pulls cost
+# and duration from each line, replacing the old split(':') walk plus two
+# separate searches per line.
+_ACTIVITY_LINE_RE = re.compile(r'^(?P<time>[^:\n]+):\s*(?P<act>.*)$', re.MULTILINE)
+_FIELDS_RE = re.compile(r'₹(?P<cost>\d+)|(?P<dur>\d+)\s*(?P<unit>hour|hr|minute|min)s?', re.IGNORECASE)
+
+# Prompt skeleton built once at import; _create_prompt only fills in the
+# per-request values instead of re-interpolating ~2 KB of static rubric
+# on every call.
+_PROMPT_TEMPLATE = """Create a detailed {duration}-day travel itinerary for {destination} with the following parameters:
+
+Budget: ₹{budget} total (₹{daily_budget} per day)
+Travel Themes: {theme_str}
+
+{all_tips}
+{youtube_content}
+
+Please create a comprehensive day-by-day itinerary that:
+1. Spans exactly {duration} days with multiple activities each day
+2. Includes for each day:
+   - Morning activities (8 AM - 12 PM)
+   - Afternoon activities (12 PM - 4 PM)
+   - Evening activities (4 PM - 8 PM)
+   - Night activities if relevant (8 PM onwards)
+3. For each activity specify:
+   - Exact time slot
+   - Estimated duration
+   - Approximate cost
+   - Transportation method
+   - Any special tips or local insights
+4. Incorporates the local expert recommendations where they fit the themes
+5. Balances the daily budget to stay within ₹{daily_budget}
+6. Considers the best time to visit each place
+7. Includes popular local food recommendations
+8. Suggests photo opportunities and viewpoints
+
+Format each day as:
+Day X:
+[Time]: [Activity] - [Duration] - ₹[Cost]
+[Description and tips]
+
+Remember to:
+- Space out activities to allow for travel time
+- Include meal times and recommendations
+- Mix popular attractions with hidden gems
+- Consider local transportation options
+- Add relevant local cultural insights"""
+
 class AIServiceFallback:
     """Fallback AI service using legacy text generation models"""
-    
+
+    # How long fetched destination data (BigQuery recs, YouTube content)
+    # stays fresh; repeat requests for the same destination inside the
+    # window skip the network entirely
+    _DEST_CACHE_TTL = 3600
+
+    # Last model that probed successfully, persisted across processes so
+    # restarts try it first instead of replaying the whole probe ladder
+    # (each failed probe is a full Vertex round-trip)
+    _MODEL_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'travelmind', 'fallback_model.json')
+
     def __init__(self):
         self.project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
         if not self.project_id:
@@ -29,10 +91,17 @@ class AIServiceFallback:
                 "chat-bison"
             ]
             
+            # Try the last-known-good model first; on a warm start the
+            # loop then succeeds on its first iteration
+            cached_model = self._load_cached_model()
+            if cached_model in legacy_models:
+                legacy_models.remove(cached_model)
+                legacy_models.insert(0, cached_model)
+
             self.generation_model = None
             self.model_type = None
             successful_model = None
-            
+
             for model_name in legacy_models:
                 try:
                     print(f"Trying legacy model: {model_name}")
@@ -54,6 +123,8 @@ class AIServiceFallback:
                     if test_response:
                         successful_model = model_name
                         print(f"✅ Successfully initialized model: {model_name}")
+                        if model_name != cached_model:
+                            self._save_cached_model(model_name)
                         break
                         
                 except Exception as model_error:
@@ -64,7 +135,11 @@ class AIServiceFallback:
                 raise Exception("No AI models are available in your project")
             
             self.bq_client = bigquery.Client()
-                
+            self._dest_cache = {}
+            # Built lazily and reused; constructing the googleapiclient
+            # discovery client per call costs a disk read + schema parse
+            self._youtube_service = None
+
         except Exception as e:
             print(f"Detailed error during AI service initialization: {str(e)}")
             error_msg = str(e)
@@ -75,8 +150,54 @@ class AIServiceFallback:
                 print("3. Check if your project has access to AI models")
                 print("4. Try enabling legacy AI Platform API: gcloud services enable ml.googleapis.com")
             raise Exception(f"Failed to initialize AI service: {error_msg}")
-        
+
+    @classmethod
+    def _load_cached_model(cls):
+        """Return the persisted last-known-good model name, if any"""
+        try:
+            with open(cls._MODEL_CACHE_PATH) as f:
+                return json.load(f).get('model')
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def _save_cached_model(cls, model_name):
+        """Persist the working model name; best-effort, never fatal"""
+        try:
+            os.makedirs(os.path.dirname(cls._MODEL_CACHE_PATH), exist_ok=True)
+            tmp_path = cls._MODEL_CACHE_PATH + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'model': model_name}, f)
+            os.replace(tmp_path, cls._MODEL_CACHE_PATH)
+        except OSError:
+            pass
+
+    def _cached_destination_fetch(self, kind, destination, fetch):
+        """Serve destination data from the TTL cache, fetching on miss"""
+        key = (kind, destination.lower().strip())
+        now = time.monotonic()
+        entry = self._dest_cache.get(key)
+        if entry and now - entry[1] < self._DEST_CACHE_TTL:
+            return entry[0]
+
+        data = fetch(destination)
+        self._dest_cache[key] = (data, now)
+        return data
+
     def _get_influencer_recommendations(self, destination):
+        """Get influencer recommendations, cached per destination"""
+        return self._cached_destination_fetch('recs', destination, self._fetch_influencer_recommendations)
+
+    def _get_youtube_content(self, destination):
+        """Get YouTube travel content, cached per destination"""
+        return self._cached_destination_fetch('youtube', destination, self._fetch_youtube_content)
+
+    def _fetch_youtube_content(self, destination):
+        if self._youtube_service is None:
+            self._youtube_service = YouTubeService()
+        return self._youtube_service.get_travel_content(destination)
+
+    def _fetch_influencer_recommendations(self, destination):
         """Get influencer recommendations from BigQuery"""
         query = f"""
         SELECT 
@@ -90,20 +211,19 @@ class AIServiceFallback:
             latitude,
             longitude
         FROM `{self.project_id}.travel_data.influencer_recommendations`
-        WHERE LOWER(destination) = LOWER(@destination)
+        WHERE LOWER(destination) = @destination_lower
         """
-        
+
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
-                bigquery.ScalarQueryParameter("destination", "STRING", destination)
+                bigquery.ScalarQueryParameter("destination_lower", "STRING", destination.lower())
             ]
         )
         
         try:
             results = self.bq_client.query(query, job_config=job_config).result()
-            recommendations = []
-            for row in results:
-                recommendations.append({
+            return [
+                {
                     'platform': row.platform,
                     'influencer': row.influencer_name,
                     'place': row.place_name,
@@ -115,8 +235,9 @@ class AIServiceFallback:
                         'lat': row.latitude,
                         'lng': row.longitude
                     }
-                })
-            return recommendations
+                }
+                for row in results
+            ]
         except Exception as e:
             print(f"Error fetching influencer data: {str(e)}")
             return []
@@ -132,20 +253,24 @@ class AIServiceFallback:
                 'daily_plans': []
             }
 
-            # Get influencer recommendations from BigQuery
-            try:
-                influencer_recommendations = self._get_influencer_recommendations(destination)
-            except Exception as e:
-                print(f"Error getting influencer recommendations: {str(e)}")
-                influencer_recommendations = []
-            
-            # Get YouTube travel content
-            try:
-                youtube_service = YouTubeService()
-                youtube_content = youtube_service.get_travel_content(destination)
-            except Exception as e:
-                print(f"Error getting YouTube content: {str(e)}")
-                youtube_content = []
+            # Fetch BigQuery recommendations and YouTube content in
+            # parallel — both are independent network calls, so wall time
+            # is the slower of the two instead of the sum
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                recs_future = executor.submit(self._get_influencer_recommendations, destination)
+                youtube_future = executor.submit(self._get_youtube_content, destination)
+
+                try:
+                    influencer_recommendations = recs_future.result() or []
+                except Exception as e:
+                    print(f"Error getting influencer recommendations: {str(e)}")
+                    influencer_recommendations = []
+
+                try:
+                    youtube_content = youtube_future.result() or []
+                except Exception as e:
+                    print(f"Error getting YouTube content: {str(e)}")
+                    youtube_content = []
             
             # Combine recommendations
             all_recommendations = {
@@ -238,46 +363,16 @@ class AIServiceFallback:
         all_tips = "Local Expert Recommendations:\n" + '\n'.join(influencer_tips) if influencer_tips else "No local recommendations available."
         youtube_content = "\nTravel Vlog Highlights:\n" + '\n'.join(youtube_insights) if youtube_insights else ""
         
-        prompt = f"""Create a detailed {duration}-day travel itinerary for {destination} with the following parameters:
-
-Budget: ₹{budget} total (₹{daily_budget:.0f} per day)
-Travel Themes: {theme_str}
-
-{all_tips}
-{youtube_content}
-
-Please create a comprehensive day-by-day itinerary that:
-1. Spans exactly {duration} days with multiple activities each day
-2. Includes for each day:
-   - Morning activities (8 AM - 12 PM)
-   - Afternoon activities (12 PM - 4 PM)
-   - Evening activities (4 PM - 8 PM)
-   - Night activities if relevant (8 PM onwards)
-3. For each activity specify:
-   - Exact time slot
-   - Estimated duration
-   - Approximate cost
-   - Transportation method
-   - Any special tips or local insights
-4. Incorporates the local expert recommendations where they fit the themes
-5. Balances the daily budget to stay within ₹{daily_budget:.0f}
-6. Considers the best time to visit each place
-7. Includes popular local food recommendations
-8. Suggests photo opportunities and viewpoints
-
-Format each day as:
-Day X:
-[Time]: [Activity] - [Duration] - ₹[Cost]
-[Description and tips]
-
-Remember to:
-- Space out activities to allow for travel time
-- Include meal times and recommendations
-- Mix popular attractions with hidden gems
-- Consider local transportation options
-- Add relevant local cultural insights"""
-        
-        return prompt
+        # Daily budget is rendered in two places; format it once
+        return _PROMPT_TEMPLATE.format(
+            duration=duration,
+            destination=destination,
+            budget=budget,
+            daily_budget=f"{daily_budget:.0f}",
+            theme_str=theme_str,
+            all_tips=all_tips,
+            youtube_content=youtube_content,
+        )
 
     def _structure_ai_response(self, ai_text, destination, duration, budget, recommendations):
         """Structure the AI response into a formatted itinerary"""
@@ -290,62 +385,76 @@ Remember to:
                 "daily_plans": []
             }
             
+            # Lowercase the matching vocabularies once up front; the loops
+            # below previously re-lowered every place and location for
+            # every activity line
+            infl_index = [
+                (rec['place'].lower(), rec)
+                for rec in recommendations.get('influencer_recommendations') or []
+            ]
+            yt_index = [
+                (location.lower(), video)
+                for video in recommendations.get('youtube_content') or []
+                for location in video.get('locations') or []
+            ]
+
             # Process AI response and extract daily plans
             # Split by days and parse activities
             day_splits = ai_text.split("Day")
             
             for day_num, day_text in enumerate(day_splits[1:], 1):
                 activities = []
-                current_activity = {}
-                
-                # Parse activities from the day's text
-                lines = day_text.strip().split('\n')
-                for line in lines[1:]:  # Skip the day number line
-                    line = line.strip()
-                    if not line:
+
+                # Drop the day-number header line, then pull every
+                # time-prefixed line from the body in one MULTILINE pass
+                day_body = day_text.split('\n', 1)[1] if '\n' in day_text else ''
+
+                for line_match in _ACTIVITY_LINE_RE.finditer(day_body):
+                    time_part = line_match.group('time').strip()
+                    activity_part = line_match.group('act').strip()
+                    if not time_part:
                         continue
-                        
-                    # Try to extract time and activity
-                    if ':' in line:
-                        # Save previous activity if exists
-                        if current_activity:
-                            activities.append(current_activity)
-                            current_activity = {}
-                            
-                        # Parse new activity
-                        time_part = line.split(':')[0].strip()
-                        activity_part = ':'.join(line.split(':')[1:]).strip()
-                        
-                        current_activity = {
-                            "time": time_part,
-                            "activity": activity_part,
-                            "cost": self._extract_cost(line),
-                            "duration": self._extract_duration(line)
-                        }
-                        
-                        # Check if this activity matches any influencer recommendations
-                        if recommendations.get('influencer_recommendations'):
-                            for rec in recommendations['influencer_recommendations']:
-                                if rec['place'].lower() in activity_part.lower():
-                                    current_activity["influencer_recommended"] = True
-                                    current_activity["tip"] = rec['tip']
-                                    break
-                                    
-                        # Check if this activity matches any YouTube recommendations
-                        if recommendations.get('youtube_content'):
-                            for video in recommendations['youtube_content']:
-                                if video.get('locations'):
-                                    for location in video['locations']:
-                                        if location.lower() in activity_part.lower():
-                                            current_activity["youtube_recommended"] = True
-                                            current_activity["video_title"] = video['title']
-                                            current_activity["video_id"] = video['video_id']
-                                            break
-                
-                # Add the last activity
-                if current_activity:
+
+                    # One fused scan for cost and duration; first hit per
+                    # field wins, like the old per-field searches
+                    cost = None
+                    duration = None
+                    for field in _FIELDS_RE.finditer(line_match.group(0)):
+                        if field.group('cost') is not None:
+                            if cost is None:
+                                cost = int(field.group('cost'))
+                        elif duration is None:
+                            unit = field.group('unit').lower()
+                            unit_label = 'hours' if 'hour' in unit or 'hr' in unit else 'minutes'
+                            duration = f"{int(field.group('dur'))} {unit_label}"
+                        if cost is not None and duration is not None:
+                            break
+
+                    current_activity = {
+                        "time": time_part,
+                        "activity": activity_part,
+                        "cost": cost if cost is not None else 0,
+                        "duration": duration if duration is not None else "1 hour"
+                    }
+
+                    # Match against the prelowered vocabularies with a
+                    # single lowered copy of the activity text
+                    activity_lower = activity_part.lower()
+                    for place, rec in infl_index:
+                        if place in activity_lower:
+                            current_activity["influencer_recommended"] = True
+                            current_activity["tip"] = rec['tip']
+                            break
+
+                    for location, video in yt_index:
+                        if location in activity_lower:
+                            current_activity["youtube_recommended"] = True
+                            current_activity["video_title"] = video['title']
+                            current_activity["video_id"] = video['video_id']
+                            break
+
                     activities.append(current_activity)
-                
+
                 # Add the day's plan
                 if activities:
                     itinerary["daily_plans"].append({
@@ -359,21 +468,3 @@ Remember to:
             print(f"Error structuring AI response: {str(e)}")
             return None
             
-    def _extract_cost(self, text):
-        """Extract cost from text"""
-        import re
-        cost_match = re.search(r'₹(\d+)', text)
-        return int(cost_match.group(1)) if cost_match else 0
-        
-    def _extract_duration(self, text):
-        """Extract duration from text"""
-        import re
-        duration_match = re.search(r'(\d+)\s*(hour|hr|minute|min)s?', text.lower())
-        if duration_match:
-            amount = int(duration_match.group(1))
-            unit = duration_match.group(2)
-            if 'hour' in unit or 'hr' in unit:
-                return f"{amount} hours"
-            else:
-                return f"{amount} minutes"
-        return "1 hour"  # default duration
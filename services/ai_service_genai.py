@@ -1,69 +1,285 @@
 from google import genai
 from google.genai.types import GenerateContentConfig
 from google.cloud import bigquery
+import asyncio
+import copy
 import json
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from config.env import ENV
 from services.youtube_service import YouTubeService
 
+# Influencer recommendations barely change day to day, so cache them
+# per destination for 24h (in memory and on disk for cold starts)
+_REC_CACHE_TTL = 86400
+_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.travelmind', 'cache')
+
+# Gemini models to try, in order of preference
+_GENAI_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-1.5-flash",
+    "gemini-1.5-pro",
+    "gemini-pro"
+]
+_MODEL_CACHE_TTL = 86400
+
+# Compiled once; these run on every parsed activity line
+_COST_RE = re.compile(r'₹(\d+)')
+_DUR_RE = re.compile(r'(\d+)\s*(hour|hr|minute|min)s?', re.IGNORECASE)
+# Tolerates markdown-wrapped headers (**Day 1:**, ## Day 2:) and a
+# missing colon; models decorate these freely
+_DAY_HDR_RE = re.compile(r'^[ \t#*]*Day\s*(\d+)', re.MULTILINE | re.IGNORECASE)
+_ACT_RE = re.compile(r'^\s*(?P<time>[^:\n]+?):\s*(?P<activity>[^\n]+)$', re.MULTILINE)
+
+# Itinerary prompt body, built once; only the per-request fields get
+# formatted in at call time
+_PROMPT_TEMPLATE = """Create a detailed {duration}-day travel itinerary for {destination} with the following parameters:
+
+Budget: ₹{budget} total (₹{daily_budget:.0f} per day)
+Travel Themes: {theme_str}
+
+{all_tips}
+{youtube_content}
+
+Please create a comprehensive day-by-day itinerary that:
+1. Spans exactly {duration} days with multiple activities each day
+2. Includes for each day:
+   - Morning activities (8 AM - 12 PM)
+   - Afternoon activities (12 PM - 4 PM)
+   - Evening activities (4 PM - 8 PM)
+   - Night activities if relevant (8 PM onwards)
+3. For each activity specify:
+   - Exact time slot
+   - Estimated duration
+   - Approximate cost
+   - Transportation method
+   - Any special tips or local insights
+4. Incorporates the local expert recommendations where they fit the themes
+5. Balances the daily budget to stay within ₹{daily_budget:.0f}
+6. Considers the best time to visit each place
+7. Includes popular local food recommendations
+8. Suggests photo opportunities and viewpoints
+
+Format each day as:
+Day X:
+[Time]: [Activity] - [Duration] - ₹[Cost]
+[Description and tips]
+
+Remember to:
+- Space out activities to allow for travel time
+- Include meal times and recommendations
+- Mix popular attractions with hidden gems
+- Consider local transportation options
+- Add relevant local cultural insights"""
+
+# Client construction resolves credentials and sets up connection pools,
+# so both clients are process-wide singletons shared across instances
+_GENAI_CLIENT = None
+_BQ_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_genai_client(project, location):
+    global _GENAI_CLIENT
+    if _GENAI_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _GENAI_CLIENT is None:
+                _GENAI_CLIENT = genai.Client(project=project, location=location)
+    return _GENAI_CLIENT
+
+
+def _get_bq_client():
+    global _BQ_CLIENT
+    if _BQ_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _BQ_CLIENT is None:
+                _BQ_CLIENT = bigquery.Client()
+    return _BQ_CLIENT
+
 class AIServiceGenAI:
     """AI service using the new Google GenAI SDK"""
     
     def __init__(self):
-        self.project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
+        self.project_id = ENV['GOOGLE_CLOUD_PROJECT']
         if not self.project_id:
             raise ValueError("GOOGLE_CLOUD_PROJECT environment variable not set")
-        
+
         try:
-            # Initialize the new GenAI client with project configuration
-            self.client = genai.Client(
-                project=self.project_id,
-                location=os.getenv('VERTEXAI_LOCATION', 'us-central1')
+            # Reuse the shared GenAI client (connection pool and all)
+            self.client = _get_genai_client(
+                self.project_id,
+                ENV['VERTEXAI_LOCATION'] or 'us-central1'
             )
             
-            # Test available models
-            available_models = [
-                "gemini-2.5-flash",
-                "gemini-1.5-flash",
-                "gemini-1.5-pro",
-                "gemini-pro"
-            ]
-            
-            self.model_name = None
-            for model in available_models:
-                try:
-                    # Test the model with a simple request
-                    test_response = self.client.models.generate_content(
-                        model=model,
-                        contents="Hello",
-                        config=GenerateContentConfig(
-                            candidate_count=1,
-                            max_output_tokens=10
-                        )
-                    )
-                    if test_response and test_response.candidates:
-                        self.model_name = model
-                        print(f"✅ Successfully initialized GenAI model: {model}")
-                        break
-                except Exception as e:
-                    print(f"❌ Model {model} not available: {str(e)[:100]}...")
-                    continue
-            
+            self.model_name = self._resolve_model_name()
             if not self.model_name:
                 raise Exception("No GenAI models are available")
             
-            self.bq_client = bigquery.Client()
+            self.bq_client = _get_bq_client()
+
+            # One YouTube client per service instead of one per request;
+            # its failure shouldn't take the whole service down
+            try:
+                self._youtube = YouTubeService()
+            except Exception as e:
+                print(f"YouTube service unavailable: {str(e)[:100]}")
+                self._youtube = None
+
+            # Circuit breakers: after a failure, skip the network call
+            # for a short window instead of re-paying the timeout on
+            # every request
+            self._bq_fail_until = 0.0
+            self._yt_fail_until = 0.0
             print(f"✅ GenAI service initialized with model: {self.model_name}")
                 
         except Exception as e:
             print(f"Detailed error during GenAI service initialization: {str(e)}")
             raise Exception(f"Failed to initialize GenAI service: {str(e)}")
-        
+
+    def _resolve_model_name(self):
+        """Pick a Gemini model without live probes when a pinned or cached choice exists.
+
+        The startup probe sends a real generate_content call per candidate
+        model, so it should only run when we genuinely don't know what
+        works in this project.
+        """
+        pinned = os.getenv('TRAVELMIND_MODEL')
+        if pinned:
+            print(f"📌 Using pinned model from TRAVELMIND_MODEL: {pinned}")
+            return pinned
+
+        cache_path = os.path.join(_CACHE_DIR, 'model.json')
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if time.time() - cached['ts'] < _MODEL_CACHE_TTL:
+                print(f"✅ Using cached GenAI model: {cached['model']}")
+                return cached['model']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if os.getenv('TRAVELMIND_DISABLE_MODEL_PROBE'):
+            # Trust the preferred model without any network call
+            return _GENAI_MODELS[0]
+
+        model_name = self._probe_models()
+        if model_name:
+            try:
+                os.makedirs(_CACHE_DIR, exist_ok=True)
+                tmp_path = cache_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({'model': model_name, 'ts': time.time()}, f)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Could not persist model cache: {str(e)}")
+        return model_name
+
+    def _probe_models(self):
+        """Probe the candidate models with a minimal request, first hit wins"""
+        for model in _GENAI_MODELS:
+            try:
+                test_response = self.client.models.generate_content(
+                    model=model,
+                    contents="Hello",
+                    config=GenerateContentConfig(
+                        candidate_count=1,
+                        max_output_tokens=10
+                    )
+                )
+                if test_response and test_response.candidates:
+                    print(f"✅ Successfully initialized GenAI model: {model}")
+                    return model
+            except Exception as e:
+                print(f"❌ Model {model} not available: {str(e)[:100]}...")
+                continue
+        return None
+
+    # Process-wide recommendation cache: destination_key -> (timestamp, recs)
+    _rec_cache = {}
+    _rec_cache_lock = threading.Lock()
+
+    @classmethod
+    def clear_recommendation_cache(cls, destination=None):
+        """Drop cached recommendations for one destination or all of them"""
+        with cls._rec_cache_lock:
+            if destination:
+                cls._rec_cache.pop(destination.lower(), None)
+            else:
+                cls._rec_cache.clear()
+
+    def _rec_cache_path(self, destination_key):
+        return os.path.join(_CACHE_DIR, f"recs_{destination_key.replace(' ', '_')}.json")
+
     def _get_influencer_recommendations(self, destination):
-        """Get influencer recommendations from BigQuery"""
+        """Get influencer recommendations, cached per destination for 24h"""
+        destination_key = destination.lower()
+        now = time.monotonic()
+
+        with self._rec_cache_lock:
+            cached = self._rec_cache.get(destination_key)
+        if cached and now - cached[0] < _REC_CACHE_TTL:
+            return cached[1]
+
+        # Cold start: a fresh-enough disk snapshot saves the BigQuery trip
+        cache_path = self._rec_cache_path(destination_key)
+        try:
+            if time.time() - os.path.getmtime(cache_path) < _REC_CACHE_TTL:
+                with open(cache_path) as f:
+                    recommendations = json.load(f)
+                with self._rec_cache_lock:
+                    self._rec_cache[destination_key] = (now, recommendations)
+                return recommendations
+        except (OSError, ValueError):
+            pass
+
+        if now < self._bq_fail_until:
+            # Breaker open: don't re-hit BigQuery until the window passes
+            recommendations = None
+        else:
+            recommendations = self._fetch_influencer_recommendations(destination)
+            if recommendations is None:
+                self._bq_fail_until = time.monotonic() + 30
+
+        if recommendations is None:
+            # Query failed: serve stale data if we have any rather than nothing
+            if cached:
+                return cached[1]
+            try:
+                with open(cache_path) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return []
+
+        with self._rec_cache_lock:
+            self._rec_cache[destination_key] = (now, recommendations)
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'w') as f:
+                json.dump(recommendations, f)
+        except OSError as e:
+            print(f"Could not persist recommendation cache: {str(e)}")
+
+        return recommendations
+
+    def _get_youtube_content(self, destination):
+        """Fetch YouTube travel content unless the breaker is open"""
+        if not self._youtube or time.monotonic() < self._yt_fail_until:
+            return []
+        try:
+            return self._youtube.get_travel_content(destination)
+        except Exception:
+            self._yt_fail_until = time.monotonic() + 30
+            raise
+
+    def _fetch_influencer_recommendations(self, destination):
+        """Run the BigQuery recommendations query; None signals failure"""
         if not self.bq_client:
             return []
-            
+
         query = f"""
         SELECT 
             platform,
@@ -76,20 +292,32 @@ class AIServiceGenAI:
             latitude,
             longitude
         FROM `{self.project_id}.travel_data.influencer_recommendations`
-        WHERE LOWER(destination) = LOWER(@destination)
+        WHERE LOWER(destination) = @destination_lower
+        ORDER BY place_name
+        LIMIT 50
         """
-        
+
+        # Lowercase the parameter in Python so the query text and params
+        # stay deterministic, letting BigQuery's server-side result cache
+        # hit on repeat destinations; the bytes cap guards regressions
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
-                bigquery.ScalarQueryParameter("destination", "STRING", destination)
-            ]
+                bigquery.ScalarQueryParameter("destination_lower", "STRING", destination.lower())
+            ],
+            use_query_cache=True,
+            maximum_bytes_billed=1024 ** 3
         )
         
         try:
-            results = self.bq_client.query(query, job_config=job_config).result()
-            recommendations = []
-            for row in results:
-                recommendations.append({
+            # Materialize in one comprehension pass; page_size matches
+            # the LIMIT so one page covers everything. (DataFrame
+            # transfer would need db-dtypes/bigquery-storage, which the
+            # project doesn't depend on — see the fallback service.)
+            results = self.bq_client.query(query, job_config=job_config).result(
+                page_size=50
+            )
+            return [
+                {
                     'platform': row.platform,
                     'influencer': row.influencer_name,
                     'place': row.place_name,
@@ -97,18 +325,144 @@ class AIServiceGenAI:
                     'category': row.category,
                     'budget_range': row.budget_range,
                     'best_time': row.best_time,
-                    'coordinates': {
-                        'lat': row.latitude,
-                        'lng': row.longitude
-                    }
-                })
-            return recommendations
+                    'coordinates': {'lat': row.latitude, 'lng': row.longitude}
+                }
+                for row in results
+            ]
         except Exception as e:
             print(f"Error fetching influencer data: {str(e)}")
-            return []
-            
+            return None
+
+    # Full-itinerary cache: repeat requests for the same trip parameters
+    # skip the entire BigQuery + YouTube + Gemini pipeline
+    _ITIN_CACHE_TTL = 3600
+    _ITIN_CACHE_MAX = 512
+    _itin_cache = {}
+    _itin_cache_lock = threading.Lock()
+
+    @staticmethod
+    def _itin_cache_key(destination, duration, budget, themes):
+        return (destination.lower(), duration, budget, tuple(sorted(themes or [])))
+
+    @classmethod
+    def clear_itinerary_cache(cls):
+        """Drop all memoized itineraries"""
+        with cls._itin_cache_lock:
+            cls._itin_cache.clear()
+
+    def has_cached_itinerary(self, destination, duration, budget, themes):
+        """True if an unexpired itinerary exists for these parameters"""
+        key = self._itin_cache_key(destination, duration, budget, themes)
+        with self._itin_cache_lock:
+            entry = self._itin_cache.get(key)
+        return bool(entry and time.monotonic() - entry[0] < self._ITIN_CACHE_TTL)
+
     def generate_itinerary(self, destination, duration, budget, themes):
-        """Generate an itinerary using Google GenAI"""
+        """Generate an itinerary using Google GenAI, memoized for 1h"""
+        key = self._itin_cache_key(destination, duration, budget, themes)
+        now = time.monotonic()
+        with self._itin_cache_lock:
+            entry = self._itin_cache.get(key)
+        if entry and now - entry[0] < self._ITIN_CACHE_TTL:
+            # Deep copies on both sides keep callers from corrupting the
+            # cached structure through in-place modification
+            return copy.deepcopy(entry[1])
+
+        itinerary = self._generate_itinerary(destination, duration, budget, themes)
+
+        # Fallback itineraries (quota errors, parse failures) come back
+        # with empty daily_plans; memoizing one would pin the degraded
+        # answer for the full TTL even after the API recovers
+        if itinerary.get('daily_plans'):
+            with self._itin_cache_lock:
+                if len(self._itin_cache) >= self._ITIN_CACHE_MAX:
+                    oldest = min(self._itin_cache, key=lambda k: self._itin_cache[k][0])
+                    del self._itin_cache[oldest]
+                self._itin_cache[key] = (now, copy.deepcopy(itinerary))
+        return itinerary
+
+    async def generate_itinerary_async(self, destination, duration, budget, themes):
+        """Async variant of generate_itinerary for event-loop callers.
+
+        The blocking BigQuery/YouTube fetches run in worker threads and
+        the Gemini call goes through the SDK's aio client, so a serving
+        loop can overlap many itinerary requests without tying up a
+        thread per request.
+        """
+        key = self._itin_cache_key(destination, duration, budget, themes)
+        now = time.monotonic()
+        with self._itin_cache_lock:
+            entry = self._itin_cache.get(key)
+        if entry and now - entry[0] < self._ITIN_CACHE_TTL:
+            return copy.deepcopy(entry[1])
+
+        itinerary = {
+            'destination': destination,
+            'duration': duration,
+            'budget': budget,
+            'daily_plans': []
+        }
+
+        inf_result, yt_result = await asyncio.gather(
+            asyncio.to_thread(self._get_influencer_recommendations, destination),
+            asyncio.to_thread(self._get_youtube_content, destination),
+            return_exceptions=True
+        )
+        if isinstance(inf_result, Exception):
+            print(f"Error getting influencer recommendations: {str(inf_result)}")
+            inf_result = []
+        if isinstance(yt_result, Exception):
+            print(f"Error getting YouTube content: {str(yt_result)}")
+            yt_result = []
+
+        all_recommendations = {
+            'influencer_recommendations': inf_result,
+            'youtube_content': yt_result
+        }
+        prompt = self._create_prompt(destination, duration, budget, themes, all_recommendations)
+
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=prompt,
+                config=GenerateContentConfig(
+                    candidate_count=1,
+                    max_output_tokens=1024,
+                    temperature=0.7,
+                    top_p=0.8,
+                    top_k=40
+                )
+            )
+            response_text = response.text if response else None
+            if not response_text:
+                raise Exception("No text content in GenAI response")
+
+            ai_response = self._structure_ai_response(
+                response_text, destination, duration, budget, all_recommendations
+            )
+            # A structure with no day plans is a failure, not a result —
+            # _structure_ai_response returns a truthy dict even when it
+            # parsed zero days, and caching that pins an empty itinerary
+            # for the full TTL
+            if not ai_response or not ai_response.get('daily_plans'):
+                raise Exception("No daily plans in structured GenAI response")
+            itinerary.update(ai_response)
+        except Exception as e:
+            print(f"Error in async GenAI generation: {str(e)}")
+            # Degrade to the sync pipeline's fallback handling off-loop
+            return await asyncio.to_thread(
+                self.generate_itinerary, destination, duration, budget, themes
+            )
+
+        with self._itin_cache_lock:
+            if len(self._itin_cache) >= self._ITIN_CACHE_MAX:
+                oldest = min(self._itin_cache, key=lambda k: self._itin_cache[k][0])
+                del self._itin_cache[oldest]
+            self._itin_cache[key] = (now, copy.deepcopy(itinerary))
+        return itinerary
+
+    def _generate_itinerary(self, destination, duration, budget, themes):
+        """Run the full generation pipeline (uncached)"""
         try:
             # Create basic itinerary structure
             itinerary = {
@@ -118,22 +472,26 @@ class AIServiceGenAI:
                 'daily_plans': []
             }
 
-            # Get influencer recommendations from BigQuery
-            try:
-                influencer_recommendations = self._get_influencer_recommendations(destination)
-                print(f"📱 Found {len(influencer_recommendations)} influencer recommendations")
-            except Exception as e:
-                print(f"Error getting influencer recommendations: {str(e)}")
-                influencer_recommendations = []
-            
-            # Get YouTube travel content
-            try:
-                youtube_service = YouTubeService()
-                youtube_content = youtube_service.get_travel_content(destination)
-                print(f"📺 Found {len(youtube_content)} YouTube recommendations")
-            except Exception as e:
-                print(f"Error getting YouTube content: {str(e)}")
-                youtube_content = []
+            # Fetch influencer recommendations (BigQuery) and YouTube
+            # content (HTTP) concurrently - they are independent I/O, so
+            # the pre-prompt wait is max() of the two instead of the sum
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                inf_future = executor.submit(self._get_influencer_recommendations, destination)
+                yt_future = executor.submit(self._get_youtube_content, destination)
+
+                try:
+                    influencer_recommendations = inf_future.result()
+                    print(f"📱 Found {len(influencer_recommendations)} influencer recommendations")
+                except Exception as e:
+                    print(f"Error getting influencer recommendations: {str(e)}")
+                    influencer_recommendations = []
+
+                try:
+                    youtube_content = yt_future.result()
+                    print(f"📺 Found {len(youtube_content)} YouTube recommendations")
+                except Exception as e:
+                    print(f"Error getting YouTube content: {str(e)}")
+                    youtube_content = []
             
             # Combine recommendations
             all_recommendations = {
@@ -153,7 +511,7 @@ class AIServiceGenAI:
                 # Add delay to avoid quota issues
                 time.sleep(2)
                 
-                response = self.client.models.generate_content(
+                stream = self.client.models.generate_content_stream(
                     model=self.model_name,
                     contents=prompt,
                     config=GenerateContentConfig(
@@ -164,26 +522,55 @@ class AIServiceGenAI:
                         top_k=40
                     )
                 )
-                
-                if not response or not response.candidates:
-                    raise Exception("Empty response from GenAI model")
-                
-                # Extract text from response
-                response_text = ""
-                for part in response.candidates[0].content.parts:
-                    if part.text:
-                        response_text += part.text
-                
-                if not response_text:
+
+                # Stream the response and hand completed day blocks to the
+                # parser while the model is still generating the rest, so
+                # structuring overlaps with generation instead of waiting
+                # for the full token block
+                rec_index, yt_index = self._build_match_indexes(all_recommendations)
+                daily_plans = []
+                pending = ""
+                response_len = 0
+
+                def _drain_completed_days(pending):
+                    headers = list(_DAY_HDR_RE.finditer(pending))
+                    while len(headers) >= 2:
+                        block = pending[headers[0].start():headers[1].start()]
+                        day_num = int(headers[0].group(1))
+                        day_plan = self._structure_one_day(block, day_num, rec_index, yt_index)
+                        if day_plan:
+                            daily_plans.append(day_plan)
+                        pending = pending[headers[1].start():]
+                        headers = list(_DAY_HDR_RE.finditer(pending))
+                    return pending
+
+                for chunk in stream:
+                    chunk_text = getattr(chunk, 'text', None)
+                    if not chunk_text:
+                        continue
+                    response_len += len(chunk_text)
+                    pending = _drain_completed_days(pending + chunk_text)
+
+                # Parse whatever remains after the stream closes
+                headers = list(_DAY_HDR_RE.finditer(pending))
+                if headers:
+                    day_num = int(headers[0].group(1))
+                    day_plan = self._structure_one_day(pending[headers[0].start():], day_num, rec_index, yt_index)
+                    if day_plan:
+                        daily_plans.append(day_plan)
+
+                if not response_len:
                     raise Exception("No text content in GenAI response")
-                    
-                print(f"✅ Received response from GenAI model, length: {len(response_text)}")
-                
-                # Parse and structure the response
-                ai_response = self._structure_ai_response(response_text, destination, duration, budget, all_recommendations)
-                if ai_response:
-                    itinerary.update(ai_response)
-                    
+
+                print(f"✅ Received response from GenAI model, length: {response_len}")
+
+                if not daily_plans:
+                    # Text arrived but no day block parsed — fail into
+                    # the fallback branch rather than returning an
+                    # itinerary with empty daily_plans
+                    raise Exception("Stream completed but no day blocks parsed")
+                itinerary['daily_plans'] = daily_plans
+
             except Exception as e:
                 error_msg = str(e)
                 print(f"Error in GenAI generation: {error_msg}")
@@ -238,70 +625,125 @@ class AIServiceGenAI:
             print(f"Error generating itinerary: {str(e)}")
             raise e
 
+    # Rendered prompt blocks per destination - the recommendation data is
+    # already destination-cached, so the joined text blocks are too.
+    # Bounded and locked like _itin_cache: destinations are unbounded
+    # user input, so the dict needs an eviction ceiling.
+    _prompt_block_cache = {}
+    _PROMPT_BLOCK_TTL = 3600
+    _PROMPT_BLOCK_MAX = 256
+    _prompt_block_lock = threading.Lock()
+
+    @staticmethod
+    def _render_tips_block(recs):
+        if not recs:
+            return "No local recommendations available."
+        return "Local Expert Recommendations:\n" + '\n'.join(
+            f"- {rec['place']}: {rec['tip']} (Best time: {rec['best_time']}, Budget: {rec['budget_range']})"
+            for rec in recs
+        )
+
+    @staticmethod
+    def _render_yt_block(youtube_content):
+        youtube_insights = [
+            f"- {location} (Featured in popular travel vlog: {video['title']})"
+            for video in youtube_content or []
+            for location in video.get('locations') or []
+        ]
+        if not youtube_insights:
+            return ""
+        return "\nTravel Vlog Highlights:\n" + '\n'.join(youtube_insights)
+
     def _create_prompt(self, destination, duration, budget, themes, recommendations):
         """Create prompt for AI generation"""
         theme_str = ', '.join(themes) if themes else 'general sightseeing'
         daily_budget = budget / duration
-        
-        # Process influencer recommendations
-        influencer_tips = []
-        if recommendations.get('influencer_recommendations'):
-            influencer_tips.extend([
-                f"- {rec['place']}: {rec['tip']} (Best time: {rec['best_time']}, Budget: {rec['budget_range']})"
-                for rec in recommendations['influencer_recommendations']
-            ])
-            
-        # Add YouTube content
-        youtube_insights = []
-        if recommendations.get('youtube_content'):
-            for video in recommendations['youtube_content']:
-                if video.get('locations'):
-                    for location in video['locations']:
-                        youtube_insights.append(f"- {location} (Featured in popular travel vlog: {video['title']})")
-                        
-        all_tips = "Local Expert Recommendations:\n" + '\n'.join(influencer_tips) if influencer_tips else "No local recommendations available."
-        youtube_content = "\nTravel Vlog Highlights:\n" + '\n'.join(youtube_insights) if youtube_insights else ""
-        
-        prompt = f"""Create a detailed {duration}-day travel itinerary for {destination} with the following parameters:
 
-Budget: ₹{budget} total (₹{daily_budget:.0f} per day)
-Travel Themes: {theme_str}
+        destination_key = destination.lower()
+        now = time.monotonic()
+        with self._prompt_block_lock:
+            cached = self._prompt_block_cache.get(destination_key)
+        if cached and now - cached[0] < self._PROMPT_BLOCK_TTL:
+            all_tips, youtube_content = cached[1], cached[2]
+        else:
+            all_tips = self._render_tips_block(recommendations.get('influencer_recommendations'))
+            youtube_content = self._render_yt_block(recommendations.get('youtube_content'))
+            with self._prompt_block_lock:
+                if len(self._prompt_block_cache) >= self._PROMPT_BLOCK_MAX:
+                    oldest = min(self._prompt_block_cache,
+                                 key=lambda k: self._prompt_block_cache[k][0])
+                    del self._prompt_block_cache[oldest]
+                self._prompt_block_cache[destination_key] = (now, all_tips, youtube_content)
 
-{all_tips}
-{youtube_content}
+        return _PROMPT_TEMPLATE.format(
+            duration=duration,
+            destination=destination,
+            budget=budget,
+            daily_budget=daily_budget,
+            theme_str=theme_str,
+            all_tips=all_tips,
+            youtube_content=youtube_content
+        )
 
-Please create a comprehensive day-by-day itinerary that:
-1. Spans exactly {duration} days with multiple activities each day
-2. Includes for each day:
-   - Morning activities (8 AM - 12 PM)
-   - Afternoon activities (12 PM - 4 PM)
-   - Evening activities (4 PM - 8 PM)
-   - Night activities if relevant (8 PM onwards)
-3. For each activity specify:
-   - Exact time slot
-   - Estimated duration
-   - Approximate cost
-   - Transportation method
-   - Any special tips or local insights
-4. Incorporates the local expert recommendations where they fit the themes
-5. Balances the daily budget to stay within ₹{daily_budget:.0f}
-6. Considers the best time to visit each place
-7. Includes popular local food recommendations
-8. Suggests photo opportunities and viewpoints
+    def _build_match_indexes(self, recommendations):
+        """Index the recommendations once so each activity line does
+        O(keys) substring checks instead of rescanning every
+        recommendation and video location with fresh .lower() copies"""
+        rec_index = {
+            rec['place'].lower(): rec
+            for rec in recommendations.get('influencer_recommendations') or []
+        }
+        yt_index = {
+            location.lower(): video
+            for video in recommendations.get('youtube_content') or []
+            for location in video.get('locations') or []
+        }
+        return rec_index, yt_index
 
-Format each day as:
-Day X:
-[Time]: [Activity] - [Duration] - ₹[Cost]
-[Description and tips]
+    def _structure_one_day(self, day_text, day_num, rec_index, yt_index):
+        """Parse one day block into a daily plan dict (None if empty)"""
+        activities = []
 
-Remember to:
-- Space out activities to allow for travel time
-- Include meal times and recommendations
-- Mix popular attractions with hidden gems
-- Consider local transportation options
-- Add relevant local cultural insights"""
-        
-        return prompt
+        # Skip the "Day N:" header line, then tokenize the rest with one
+        # regex pass instead of splitting per line and re-joining on ':'
+        header_end = day_text.find('\n')
+        if header_end == -1:
+            return None
+
+        for match in _ACT_RE.finditer(day_text, header_end + 1):
+            time_part = match.group('time').strip()
+            activity_part = match.group('activity').strip()
+            line = match.group(0)
+
+            activity = {
+                "time": time_part,
+                "activity": activity_part,
+                "cost": self._extract_cost(line),
+                "duration": self._extract_duration(line)
+            }
+
+            act_lower = activity_part.lower()
+
+            # Check if this activity matches any influencer recommendations
+            for place_lower, rec in rec_index.items():
+                if place_lower in act_lower:
+                    activity["influencer_recommended"] = True
+                    activity["tip"] = rec['tip']
+                    break
+
+            # Check if this activity matches any YouTube recommendations
+            for location_lower, video in yt_index.items():
+                if location_lower in act_lower:
+                    activity["youtube_recommended"] = True
+                    activity["video_title"] = video['title']
+                    activity["video_id"] = video['video_id']
+                    break
+
+            activities.append(activity)
+
+        if activities:
+            return {"day": day_num, "activities": activities}
+        return None
 
     def _structure_ai_response(self, ai_text, destination, duration, budget, recommendations):
         """Structure the AI response into a formatted itinerary"""
@@ -313,89 +755,37 @@ Remember to:
                 "budget": budget,
                 "daily_plans": []
             }
-            
-            # Process AI response and extract daily plans
-            # Split by days and parse activities
-            day_splits = ai_text.split("Day")
-            
-            for day_num, day_text in enumerate(day_splits[1:], 1):
-                activities = []
-                current_activity = {}
-                
-                # Parse activities from the day's text
-                lines = day_text.strip().split('\n')
-                for line in lines[1:]:  # Skip the day number line
-                    line = line.strip()
-                    if not line:
-                        continue
-                        
-                    # Try to extract time and activity
-                    if ':' in line:
-                        # Save previous activity if exists
-                        if current_activity:
-                            activities.append(current_activity)
-                            current_activity = {}
-                            
-                        # Parse new activity
-                        time_part = line.split(':')[0].strip()
-                        activity_part = ':'.join(line.split(':')[1:]).strip()
-                        
-                        current_activity = {
-                            "time": time_part,
-                            "activity": activity_part,
-                            "cost": self._extract_cost(line),
-                            "duration": self._extract_duration(line)
-                        }
-                        
-                        # Check if this activity matches any influencer recommendations
-                        if recommendations.get('influencer_recommendations'):
-                            for rec in recommendations['influencer_recommendations']:
-                                if rec['place'].lower() in activity_part.lower():
-                                    current_activity["influencer_recommended"] = True
-                                    current_activity["tip"] = rec['tip']
-                                    break
-                                    
-                        # Check if this activity matches any YouTube recommendations
-                        if recommendations.get('youtube_content'):
-                            for video in recommendations['youtube_content']:
-                                if video.get('locations'):
-                                    for location in video['locations']:
-                                        if location.lower() in activity_part.lower():
-                                            current_activity["youtube_recommended"] = True
-                                            current_activity["video_title"] = video['title']
-                                            current_activity["video_id"] = video['video_id']
-                                            break
-                
-                # Add the last activity
-                if current_activity:
-                    activities.append(current_activity)
-                
-                # Add the day's plan
-                if activities:
-                    itinerary["daily_plans"].append({
-                        "day": day_num,
-                        "activities": activities
-                    })
-            
+
+            rec_index, yt_index = self._build_match_indexes(recommendations)
+
+            # Walk the day headers and slice each block directly instead
+            # of splitting the whole text on "Day"
+            headers = list(_DAY_HDR_RE.finditer(ai_text))
+            for i, header in enumerate(headers):
+                end = headers[i + 1].start() if i + 1 < len(headers) else len(ai_text)
+                day_plan = self._structure_one_day(
+                    ai_text[header.start():end], int(header.group(1)), rec_index, yt_index
+                )
+                if day_plan:
+                    itinerary["daily_plans"].append(day_plan)
+
             return itinerary
-            
+
         except Exception as e:
             print(f"Error structuring AI response: {str(e)}")
             return None
             
     def _extract_cost(self, text):
         """Extract cost from text"""
-        import re
-        cost_match = re.search(r'₹(\d+)', text)
+        cost_match = _COST_RE.search(text)
         return int(cost_match.group(1)) if cost_match else 0
-        
+
     def _extract_duration(self, text):
         """Extract duration from text"""
-        import re
-        duration_match = re.search(r'(\d+)\s*(hour|hr|minute|min)s?', text.lower())
+        duration_match = _DUR_RE.search(text)
         if duration_match:
             amount = int(duration_match.group(1))
-            unit = duration_match.group(2)
+            unit = duration_match.group(2).lower()
             if 'hour' in unit or 'hr' in unit:
                 return f"{amount} hours"
             else:
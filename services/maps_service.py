@@ -1,60 +1,97 @@
-import googlemaps
-from datetime import datetime
-import os
-
-class MapsService:
-    def __init__(self, maps_client):
-        self.gmaps = maps_client
-    
-    def get_place_details(self, location):
-        """Get tourist attractions near a location"""
-        try:
-            # First, geocode the location
-            geocode_result = self.gmaps.geocode(location)
-            if not geocode_result:
-                return None
-            
-            location_coords = (
-                geocode_result[0]['geometry']['location']['lat'],
-                geocode_result[0]['geometry']['location']['lng']
-            )
-            
-            # Get nearby places
-            places = self.gmaps.places_nearby(
-                location=location_coords,
-                radius=5000,
-                type='tourist_attraction'
-            )
-            
-            return places.get('results', [])
-        except Exception as e:
-            print(f"Error getting place details: {str(e)}")
-            return None
-
-    def get_route_info(self, origin, destination):
-        """Get route information between two points"""
-        try:
-            route = self.gmaps.directions(
-                origin,
-                destination,
-                mode="driving",
-                departure_time=datetime.now()
-            )
-            return route[0] if route else None
-        except Exception as e:
-            print(f"Error getting route info: {str(e)}")
-            return None
-
-    def get_place_photos(self, place_id):
-        """Get photos for a specific place"""
-        try:
-            place = self.gmaps.place(place_id, fields=['photos'])
-            if 'photos' in place['result']:
-                return [
-                    self.gmaps.places_photo(photo['photo_reference'])
-                    for photo in place['result']['photos'][:3]  # Limit to 3 photos
-                ]
-            return []
-        except Exception as e:
-            print(f"Error getting place photos: {str(e)}")
-            return []
+import googlemaps
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+import time
+
+class MapsService:
+    # Maps results are stable and billed per call, so cache hits skip both
+    # the round-trip and the charge. Geocodes and nearby places are good
+    # for a day; routes are keyed per hour so traffic stays fresh-ish.
+    _CACHE_TTL = 86400
+
+    def __init__(self, maps_client):
+        self.gmaps = maps_client
+        self._cache = {}
+
+    def _cached(self, key, fetch):
+        """Return a cached API result if still fresh, else fetch and store"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and now - entry[1] < self._CACHE_TTL:
+            return entry[0]
+
+        value = fetch()
+        self._cache[key] = (value, now)
+        return value
+
+    def get_place_details(self, location):
+        """Get tourist attractions near a location"""
+        try:
+            # First, geocode the location
+            geocode_result = self._cached(
+                ('geocode', location.strip().lower()),
+                lambda: self.gmaps.geocode(location)
+            )
+            if not geocode_result:
+                return None
+
+            location_coords = (
+                geocode_result[0]['geometry']['location']['lat'],
+                geocode_result[0]['geometry']['location']['lng']
+            )
+
+            # Get nearby places; rounding to 3 decimals (~100 m) folds
+            # nearby geocodes of the same spot onto one cache entry
+            places = self._cached(
+                ('nearby', round(location_coords[0], 3), round(location_coords[1], 3), 5000, 'tourist_attraction'),
+                lambda: self.gmaps.places_nearby(
+                    location=location_coords,
+                    radius=5000,
+                    type='tourist_attraction'
+                )
+            )
+
+            return places.get('results', [])
+        except Exception as e:
+            print(f"Error getting place details: {str(e)}")
+            return None
+
+    def get_route_info(self, origin, destination):
+        """Get route information between two points"""
+        try:
+            route = self._cached(
+                ('route', str(origin).strip().lower(), str(destination).strip().lower(), 'driving', datetime.now().hour),
+                lambda: self.gmaps.directions(
+                    origin,
+                    destination,
+                    mode="driving",
+                    departure_time=datetime.now()
+                )
+            )
+            return route[0] if route else None
+        except Exception as e:
+            print(f"Error getting route info: {str(e)}")
+            return None
+
+    def get_place_photos(self, place_id):
+        """Get photos for a specific place"""
+        try:
+            place = self._cached(
+                ('place_photos', place_id),
+                lambda: self.gmaps.place(place_id, fields=['photos'])
+            )
+            photos = place['result'].get('photos', [])[:3]  # Limit to 3 photos
+            if not photos:
+                return []
+
+            # Each photo is its own HTTP round-trip; fetch them
+            # concurrently so three photos cost one RTT instead of three
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                return list(executor.map(
+                    lambda photo: self.gmaps.places_photo(photo['photo_reference']),
+                    photos
+                ))
+        except Exception as e:
+            print(f"Error getting place photos: {str(e)}")
+            return []
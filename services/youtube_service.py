@@ -2,13 +2,63 @@ from googleapiclient.discovery import build
 from google.cloud import bigquery
 import json
 import os
+import re
+import time
 from datetime import datetime
 
+# Location patterns compiled once at import as a single alternation, so
+# each description gets one finditer pass instead of five separate scans
+# (and no per-call re.compile).
+_LOCATION_RE = re.compile(
+    r'visit(?:ing)?\s+([A-Z][a-zA-Z\s]+)'
+    r'|at\s+([A-Z][a-zA-Z\s]+)'
+    r'|in\s+([A-Z][a-zA-Z\s]+)'
+    r'|location:\s*([A-Z][a-zA-Z\s]+)'
+    r'|places?(?:\s+to\s+visit)?:\s*([A-Z][a-zA-Z\s]+)'
+)
+
+# Clients shared across YouTubeService instances. Constructing either
+# one is expensive (auth token exchange for BigQuery, discovery-doc
+# fetch and parse for the YouTube API), so pay it once per process
+# instead of per instantiation.
+_bq_client = None
+_yt_client = None
+
+def _get_bq_client():
+    global _bq_client
+    if _bq_client is None:
+        _bq_client = bigquery.Client()
+    return _bq_client
+
+def _get_yt_client(api_key):
+    global _yt_client
+    if _yt_client is None:
+        # static_discovery builds the client from the discovery document
+        # bundled with google-api-python-client, so cold start never
+        # fetches it over HTTP
+        _yt_client = build('youtube', 'v3', developerKey=api_key,
+                           static_discovery=True)
+    return _yt_client
+
 class YouTubeService:
+    # In-process TTL cache in front of the BigQuery cache-table query,
+    # shared across instances: asking for the same location again within
+    # the window skips the ~500ms query round trip entirely. Short TTL —
+    # BigQuery stays the source of truth.
+    _QUERY_CACHE_TTL = 300
+    _query_cache = {}
+
+    # (location, video_id) pairs this process has already written to or
+    # read from the BigQuery cache table within its 7-day freshness
+    # window. Streaming inserts have no merge step, so this is what
+    # keeps cache refreshes from piling up duplicate rows.
+    _WRITTEN_TTL = 7 * 86400
+    _written_keys = {}
+
     def __init__(self):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
-        self.bq_client = bigquery.Client()
+        self.youtube = _get_yt_client(self.api_key)
+        self.bq_client = _get_bq_client()
 
     def get_travel_content(self, location):
         """Get travel content for a specific location"""
@@ -26,19 +76,33 @@ class YouTubeService:
                 type='video',
                 videoDefinition='high',
                 relevanceLanguage='en',
-                videoDuration='medium'  # Filter for medium length videos
+                videoDuration='medium',  # Filter for medium length videos
+                # Partial response: only ship the snippet fields we read
+                fields='items(id/videoId,snippet(title,channelTitle,thumbnails/high/url,publishedAt))'
             ).execute()
 
+            # One batched videos().list covers statistics and descriptions
+            # for every search hit, instead of two API calls per video
+            video_ids = [
+                item['id']['videoId']
+                for item in search_response['items']
+                if item.get('id', {}).get('videoId')
+            ]
+            details_by_id = self._get_videos_details(video_ids)
+
             processed_content = []
             for item in search_response['items']:
                 try:
                     video_id = item['id']['videoId']
-                    video_info = self._get_video_details(video_id)
-                    
-                    if video_info:
-                        # Extract locations and recommendations from video
-                        locations = self._extract_video_content(video_id)
-                        
+                    details = details_by_id.get(video_id)
+
+                    if details:
+                        stats = details.get('statistics', {})
+                        # Extract locations and recommendations from the
+                        # description we already fetched
+                        description = details.get('snippet', {}).get('description', '')
+                        locations = self._extract_locations(description)
+
                         content = {
                             'video_id': video_id,
                             'title': item['snippet']['title'],
@@ -46,83 +110,64 @@ class YouTubeService:
                             'thumbnail': item['snippet']['thumbnails']['high']['url'],
                             'published_at': item['snippet']['publishedAt'],
                             'locations': locations,
-                            'view_count': video_info.get('view_count', 0),
-                            'like_count': video_info.get('like_count', 0)
+                            'view_count': int(stats.get('viewCount', 0)),
+                            'like_count': int(stats.get('likeCount', 0))
                         }
-                        
+
                         processed_content.append(content)
-                        
-                        # Cache the content in BigQuery
-                        try:
-                            self._cache_content(location, content)
-                        except Exception as cache_error:
-                            print(f"Failed to cache content: {str(cache_error)}")
-                            
+
                 except Exception as video_error:
                     print(f"Error processing video {item.get('id', {}).get('videoId', 'unknown')}: {str(video_error)}")
                     continue
 
+            # Cache everything in BigQuery with one batched write
+            try:
+                self._cache_content(location, processed_content)
+            except Exception as cache_error:
+                print(f"Failed to cache content: {str(cache_error)}")
+
             return processed_content
 
         except Exception as e:
             print(f"Error fetching travel content: {str(e)}")
             return []
 
-    def _get_video_details(self, video_id):
-        """Get detailed information about a specific video"""
+    def _get_videos_details(self, video_ids):
+        """Fetch statistics and snippets for a batch of videos in one call
+
+        The videos endpoint accepts up to 50 comma-separated IDs, so the
+        whole search page costs a single round trip instead of one per
+        video. Returns a video_id -> API item mapping.
+        """
+        if not video_ids:
+            return {}
+
         try:
             video_response = self.youtube.videos().list(
-                part='statistics,contentDetails',
-                id=video_id
+                part='snippet,statistics,contentDetails',
+                id=','.join(video_ids),
+                maxResults=50,
+                fields='items(id,snippet/description,statistics(viewCount,likeCount))'
             ).execute()
 
-            if video_response['items']:
-                stats = video_response['items'][0]['statistics']
-                return {
-                    'view_count': int(stats.get('viewCount', 0)),
-                    'like_count': int(stats.get('likeCount', 0))
-                }
-            return None
+            return {item['id']: item for item in video_response.get('items', [])}
 
         except Exception as e:
             print(f"Error fetching video details: {str(e)}")
-            return None
+            return {}
 
-    def _extract_video_content(self, video_id):
-        """Extract location mentions and recommendations from video"""
+    def _extract_locations(self, description):
+        """Extract location mentions from a video description"""
         try:
-            # Get video details and description
-            video_response = self.youtube.videos().list(
-                part='snippet',
-                id=video_id
-            ).execute()
+            # For hackathon MVP, we'll extract any text that looks like a
+            # location; dedupe into a set as we go
+            locations = set()
+            for match in _LOCATION_RE.finditer(description):
+                location = next(g for g in match.groups() if g).strip()
+                if location and len(location) > 3:  # Avoid too short matches
+                    locations.add(location)
 
-            locations = []
-            if 'items' in video_response:
-                description = video_response['items'][0]['snippet']['description']
-                # Extract locations from description
-                # For hackathon MVP, we'll extract any text that looks like a location
-                import re
-                # Look for common location patterns
-                location_patterns = [
-                    r'visit(?:ing)?\s+([A-Z][a-zA-Z\s]+)',
-                    r'at\s+([A-Z][a-zA-Z\s]+)',
-                    r'in\s+([A-Z][a-zA-Z\s]+)',
-                    r'location:\s*([A-Z][a-zA-Z\s]+)',
-                    r'places?(?:\s+to\s+visit)?:\s*([A-Z][a-zA-Z\s]+)'
-                ]
-                
-                for pattern in location_patterns:
-                    matches = re.finditer(pattern, description)
-                    for match in matches:
-                        location = match.group(1).strip()
-                        if location and len(location) > 3:  # Avoid too short matches
-                            locations.append(location)
-                
-                # Remove duplicates
-                locations = list(set(locations))
-
-            return locations
+            return list(locations)
 
         except Exception as e:
             print(f"Error extracting video content: {str(e)}")
@@ -130,8 +175,17 @@ class YouTubeService:
 
     def _get_cached_content(self, location):
         """Get cached content from BigQuery"""
+        cache_key = location.lower().strip()
+        now = time.monotonic()
+        entry = self._query_cache.get(cache_key)
+        if entry and now - entry[1] < self._QUERY_CACHE_TTL:
+            return entry[0]
+
+        # Project only the columns callers use — SELECT * bills and ships
+        # every column in the table
         query = f"""
-        SELECT *
+        SELECT video_id, title, channel, thumbnail_url, published_at,
+               view_count, like_count, locations
         FROM `{self.bq_client.project}.travel_data.youtube_content`
         WHERE location = @location
         AND created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
@@ -139,46 +193,81 @@ class YouTubeService:
         LIMIT 5
         """
         
+        # Let BigQuery serve repeats from its server-side result cache;
+        # the byte cap keeps a malformed query from scanning the table
         job_config = bigquery.QueryJobConfig(
             query_parameters=[
                 bigquery.ScalarQueryParameter("location", "STRING", location)
-            ]
+            ],
+            use_query_cache=True,
+            maximum_bytes_billed=10**9
         )
         
         try:
             results = self.bq_client.query(query, job_config=job_config).result()
-            return [dict(row) for row in results]
+            rows = [dict(row) for row in results]
+            # Only cache hits; an empty result means the fetch path runs
+            # and repopulates BigQuery, after which we want a fresh read
+            if rows:
+                self._query_cache[cache_key] = (rows, now)
+            for row in rows:
+                self._written_keys[(cache_key, row['video_id'])] = now
+            return rows
         except Exception as e:
             print(f"Error fetching cached content: {str(e)}")
             return None
 
-    def _cache_content(self, location, content):
-        """Cache content in BigQuery"""
-        query = f"""
-        INSERT INTO `{self.bq_client.project}.travel_data.youtube_content`
-        (location, video_id, title, channel, thumbnail_url, published_at, 
-         view_count, like_count, locations, created_at)
-        VALUES
-        (@location, @video_id, @title, @channel, @thumbnail, @published_at,
-         @views, @likes, @locations, CURRENT_TIMESTAMP())
+    def _cache_content(self, location, contents):
+        """Cache a batch of content in BigQuery
+
+        One streaming insert_rows_json call covers the whole fetch (same
+        pattern as FeedbackHandler.store_feedback), instead of one
+        rate-limited DML query job per video.
         """
-        
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("location", "STRING", location),
-                bigquery.ScalarQueryParameter("video_id", "STRING", content['video_id']),
-                bigquery.ScalarQueryParameter("title", "STRING", content['title']),
-                bigquery.ScalarQueryParameter("channel", "STRING", content['channel']),
-                bigquery.ScalarQueryParameter("thumbnail", "STRING", content['thumbnail']),
-                bigquery.ScalarQueryParameter("published_at", "TIMESTAMP", content['published_at']),
-                bigquery.ScalarQueryParameter("views", "INTEGER", content['view_count']),
-                bigquery.ScalarQueryParameter("likes", "INTEGER", content['like_count']),
-                bigquery.ScalarQueryParameter("locations", "STRING", json.dumps(content['locations']))
-            ]
-        )
-        
+        if not contents:
+            return
+
+        # Drop videos we already know are in the table's 7-day window
+        now = time.monotonic()
+        location_key = location.lower().strip()
+        fresh_contents = []
+        for content in contents:
+            written = self._written_keys.get((location_key, content['video_id']))
+            if written and now - written < self._WRITTEN_TTL:
+                continue
+            fresh_contents.append(content)
+
+        if not fresh_contents:
+            return
+        contents = fresh_contents
+
+        created_at = datetime.utcnow().isoformat()
+        rows_to_insert = [
+            {
+                'location': location,
+                'video_id': content['video_id'],
+                'title': content['title'],
+                'channel': content['channel'],
+                'thumbnail_url': content['thumbnail'],
+                'published_at': content['published_at'],
+                'view_count': content['view_count'],
+                'like_count': content['like_count'],
+                'locations': json.dumps(content['locations']),
+                'created_at': created_at
+            }
+            for content in contents
+        ]
+
         try:
-            self.bq_client.query(query, job_config=job_config).result()
+            errors = self.bq_client.insert_rows_json(
+                f"{self.bq_client.project}.travel_data.youtube_content",
+                rows_to_insert
+            )
+            if errors:
+                print(f"Error caching content: {errors}")
+            else:
+                for content in contents:
+                    self._written_keys[(location_key, content['video_id'])] = now
         except Exception as e:
             print(f"Error caching content: {str(e)}")
 
@@ -1,51 +1,58 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai.types import GenerateContentConfig
 
+def _probe_location(location):
+    """Probe one location; returns (location, status line)"""
+    try:
+        # Pass the location explicitly instead of mutating process-wide
+        # environment variables, so probes can run concurrently
+        client = genai.Client(
+            project=os.getenv('GOOGLE_CLOUD_PROJECT'),
+            location=location
+        )
+
+        # Test with a simple model
+        response = client.models.generate_content(
+            model="gemini-1.5-flash",
+            contents="Hello",
+            config=GenerateContentConfig(
+                candidate_count=1,
+                max_output_tokens=10
+            )
+        )
+
+        if response and response.candidates:
+            return location, f"  ✅ {location} - WORKING"
+        return location, f"  ⚠️  {location} - No response"
+
+    except Exception as e:
+        error_msg = str(e)
+        if "not found" in error_msg.lower():
+            return location, f"  ❌ {location} - Models not available"
+        elif "permission" in error_msg.lower():
+            return location, f"  🔒 {location} - Permission denied"
+        else:
+            return location, f"  ❌ {location} - Error: {error_msg[:50]}..."
+
 def test_locations():
     locations = [
         'us-central1',
-        'us-east1', 
+        'us-east1',
         'us-west1',
         'europe-west1',
         'asia-southeast1'
     ]
-    
+
     print("🌍 Testing Vertex AI locations for your project...")
-    
-    for location in locations:
-        print(f"\n📍 Testing {location}:")
-        
-        try:
-            # Set environment variable for this test
-            os.environ['VERTEXAI_LOCATION'] = location
-            
-            # Try to initialize GenAI client
-            client = genai.Client()
-            
-            # Test with a simple model
-            response = client.models.generate_content(
-                model="gemini-1.5-flash",
-                contents="Hello",
-                config=GenerateContentConfig(
-                    candidate_count=1,
-                    max_output_tokens=10
-                )
-            )
-            
-            if response and response.candidates:
-                print(f"  ✅ {location} - WORKING")
-            else:
-                print(f"  ⚠️  {location} - No response")
-                
-        except Exception as e:
-            error_msg = str(e)
-            if "not found" in error_msg.lower():
-                print(f"  ❌ {location} - Models not available")
-            elif "permission" in error_msg.lower():
-                print(f"  🔒 {location} - Permission denied")
-            else:
-                print(f"  ❌ {location} - Error: {error_msg[:50]}...")
+
+    # Each probe is a full network round trip (1-5s); fanning them out
+    # makes the sweep cost the slowest probe instead of the sum
+    with ThreadPoolExecutor(max_workers=len(locations)) as executor:
+        for location, status in executor.map(_probe_location, locations):
+            print(f"\n📍 Testing {location}:")
+            print(status)
 
 if __name__ == "__main__":
-    test_locations()
\ No newline at end of file
+    test_locations()
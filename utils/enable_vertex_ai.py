@@ -37,23 +37,42 @@ def check_and_enable_apis():
         return False
     
     enabled_apis = stdout.lower()
-    
-    # Enable missing APIs
+
+    # Collect missing APIs and enable them in one gcloud invocation —
+    # each gcloud run pays ~1-2s of SDK startup, so batching turns up to
+    # five cold starts into one
+    missing = []
     for api, description in apis:
         if api in enabled_apis:
             print(f"✅ {description} ({api}) - Already enabled")
         else:
-            print(f"🔄 Enabling {description} ({api})...")
-            success, stdout, stderr = run_gcloud_command(f"gcloud services enable {api} --project={project_id}")
-            
-            if success:
+            print(f"🔄 Will enable {description} ({api})")
+            missing.append((api, description))
+
+    if missing:
+        api_list = ' '.join(api for api, _ in missing)
+        print(f"🔄 Enabling {len(missing)} API(s)...")
+        success, stdout, stderr = run_gcloud_command(f"gcloud services enable {api_list} --project={project_id}")
+
+        if success:
+            for _, description in missing:
                 print(f"✅ {description} enabled successfully")
-            else:
-                print(f"❌ Failed to enable {description}: {stderr}")
-    
-    print("\n⏳ Waiting for APIs to propagate (30 seconds)...")
-    time.sleep(30)
-    
+        else:
+            print(f"❌ Failed to enable APIs: {stderr}")
+
+        # Poll for propagation instead of a blind 30-second sleep; most
+        # enables show up in the services list within a few seconds
+        print("\n⏳ Waiting for APIs to propagate...")
+        deadline = time.monotonic() + 30
+        pending = {api for api, _ in missing}
+        while pending and time.monotonic() < deadline:
+            time.sleep(2)
+            success, stdout, stderr = run_gcloud_command(f"gcloud services list --enabled --project={project_id}")
+            if success:
+                pending = {api for api in pending if api not in stdout.lower()}
+        if pending:
+            print(f"⚠️  Still propagating: {', '.join(sorted(pending))}")
+
     return True
 
 def check_vertex_ai_access():
@@ -2,8 +2,38 @@ import vertexai
 from vertexai.language_models import TextGenerationModel, ChatModel
 from vertexai.generative_models import GenerativeModel
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+def _probe_model(model_name, model_type):
+    """Probe one model; returns (status text, is_working)"""
+    try:
+        if model_type == "legacy_text":
+            model = TextGenerationModel.from_pretrained(model_name)
+            response = model.predict("Hello", max_output_tokens=10)
+        elif model_type == "legacy_chat":
+            model = ChatModel.from_pretrained(model_name)
+            chat = model.start_chat()
+            response = chat.send_message("Hello", max_output_tokens=10)
+        else:  # gemini
+            model = GenerativeModel(model_name)
+            response = model.generate_content("Hello")
+
+        if response and response.text:
+            return "✅ WORKING", True
+        return "⚠️  NO RESPONSE", False
+
+    except Exception as e:
+        error_msg = str(e).lower()
+        if "not found" in error_msg or "does not exist" in error_msg:
+            return "❌ NOT FOUND", False
+        elif "permission" in error_msg or "access" in error_msg:
+            return "🔒 NO ACCESS", False
+        elif "quota" in error_msg or "limit" in error_msg:
+            return "⚠️  QUOTA EXCEEDED", False
+        else:
+            return f"❌ ERROR: {str(e)[:50]}...", False
+
 def test_ai_models_direct():
     """Test AI models directly using service account credentials"""
     load_dotenv()
@@ -49,54 +79,27 @@ def test_ai_models_direct():
         ])
     ]
     
+    # Every probe is an independent network call, so run them all
+    # concurrently and keep the per-category printout by joining
+    # results back in the original order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            (model_name, model_type): executor.submit(_probe_model, model_name, model_type)
+            for _, models in model_tests
+            for model_name, model_type in models
+        }
+
     working_models = []
-    
+
     for category, models in model_tests:
         print(f"\n🧪 Testing {category}:")
         print("-" * 30)
-        
+
         for model_name, model_type in models:
-            try:
-                print(f"  Testing {model_name}...", end=" ")
-                
-                if model_type == "legacy_text":
-                    model = TextGenerationModel.from_pretrained(model_name)
-                    response = model.predict("Hello", max_output_tokens=10)
-                    if response and response.text:
-                        print("✅ WORKING")
-                        working_models.append((model_name, model_type))
-                    else:
-                        print("⚠️  NO RESPONSE")
-                        
-                elif model_type == "legacy_chat":
-                    model = ChatModel.from_pretrained(model_name)
-                    chat = model.start_chat()
-                    response = chat.send_message("Hello", max_output_tokens=10)
-                    if response and response.text:
-                        print("✅ WORKING")
-                        working_models.append((model_name, model_type))
-                    else:
-                        print("⚠️  NO RESPONSE")
-                        
-                elif model_type == "gemini":
-                    model = GenerativeModel(model_name)
-                    response = model.generate_content("Hello")
-                    if response and response.text:
-                        print("✅ WORKING")
-                        working_models.append((model_name, model_type))
-                    else:
-                        print("⚠️  NO RESPONSE")
-                        
-            except Exception as e:
-                error_msg = str(e).lower()
-                if "not found" in error_msg or "does not exist" in error_msg:
-                    print("❌ NOT FOUND")
-                elif "permission" in error_msg or "access" in error_msg:
-                    print("🔒 NO ACCESS")
-                elif "quota" in error_msg or "limit" in error_msg:
-                    print("⚠️  QUOTA EXCEEDED")
-                else:
-                    print(f"❌ ERROR: {str(e)[:50]}...")
+            status, is_working = futures[(model_name, model_type)].result()
+            print(f"  Testing {model_name}... {status}")
+            if is_working:
+                working_models.append((model_name, model_type))
     
     # Summary
     print("\n" + "="*50)
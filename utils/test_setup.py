@@ -1,12 +1,6 @@
-from google.cloud import bigquery
-from google.cloud import aiplatform
-import vertexai
-from google.cloud import aiplatform
-from google.oauth2 import service_account
-import vertexai
-from vertexai.generative_models import GenerativeModel
-from google.cloud import bigquery
-import googlemaps
+# Cloud SDK imports live inside the test functions that need them: each
+# one (vertexai especially) costs hundreds of ms of gRPC stub setup,
+# which shouldn't be paid just to import this module.
 import os
 from dotenv import load_dotenv
 
@@ -63,6 +57,8 @@ def test_credentials_file():
         return False
     
     try:
+        from google.oauth2 import service_account
+
         credentials = service_account.Credentials.from_service_account_file(
             credentials_path,
             scopes=["https://www.googleapis.com/auth/cloud-platform"]
@@ -75,6 +71,8 @@ def test_credentials_file():
     # Test 5: Google Maps API
     print("\n5. Testing Google Maps API...")
     try:
+        import googlemaps
+
         gmaps = googlemaps.Client(key=os.getenv('GOOGLE_MAPS_API_KEY'))
         result = gmaps.geocode('Delhi, India')
         if result: